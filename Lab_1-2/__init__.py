@@ -1,7 +1,14 @@
+from .alphabet import Alphabet, custom_alphabet, get_alphabet, register_alphabet
 from .matrix_cipher import MatrixCipher
+from .vigenere_analysis import VigenereAnalyzer
 from .vigenere_cipher import VigenereCipher
 
 __all__: list[str] = [
+    "Alphabet",
+    "custom_alphabet",
+    "get_alphabet",
+    "register_alphabet",
     "MatrixCipher",
+    "VigenereAnalyzer",
     "VigenereCipher",
 ]
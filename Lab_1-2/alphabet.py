@@ -0,0 +1,139 @@
+#!/usr/bin/python3
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, Final, Iterable, Mapping, Union
+
+Symbols = Union[str, bytes]
+BytesLike = Union[bytes, bytearray, memoryview]
+Message = Union[str, BytesLike]
+
+
+@dataclass(frozen=True)
+class Alphabet:
+    """
+    An immutable alphabet the classical ciphers work over.
+
+    Text alphabets hold a str of letters, the input is stripped of spaces and,
+    when all the letters are lowercase, lowercased before encryption. Byte
+    alphabets hold a bytes object and the input is taken as is, so binary
+    payloads are never decoded.
+    """
+
+    name: str
+    symbols: Symbols
+    padding: Symbols
+    indices: Mapping[Union[str, int], int] = field(
+        init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        """
+        Validates the symbols and compiles the symbol to index mapping.
+        """
+        if not self.symbols:
+            raise ValueError("The alphabet must not be empty")
+        if len(set(self.symbols)) != len(self.symbols):
+            raise ValueError("The alphabet must not contain repeated symbols")
+        if isinstance(self.symbols, str) != isinstance(self.padding, str):
+            raise TypeError("The padding must be of the same type as the symbols")
+
+        object.__setattr__(
+            self,
+            "indices",
+            MappingProxyType({symbol: i for i, symbol in enumerate(self.symbols)}),
+        )
+
+    @property
+    def is_bytes(self) -> bool:
+        """
+        Whether the alphabet works directly on bytes.
+        """
+        return isinstance(self.symbols, bytes)
+
+    @property
+    def casefold(self) -> bool:
+        """
+        Whether text is lowercased, which is the case for lowercase alphabets.
+        """
+        return not self.is_bytes and self.symbols == self.symbols.lower()
+
+    def normalize(self, text: Message) -> Symbols:
+        """
+        Prepares a message or a key for encryption.
+
+        :param text: The text, or a bytes-like object for byte alphabets.
+        :return: The text without spaces and case folded, or the bytes unchanged.
+        """
+        if self.is_bytes:
+            return text if isinstance(text, bytes) else bytes(text)
+
+        text = text.replace(" ", "")
+        return text.lower() if self.casefold else text
+
+    def join(self, symbols: Iterable[Union[str, int]]) -> Symbols:
+        """
+        Assembles a sequence of symbols into a message.
+
+        :param symbols: Characters for text alphabets, byte values for byte alphabets.
+        :return: The message.
+        """
+        return bytes(symbols) if self.is_bytes else "".join(symbols)
+
+
+ALPHABETS: Final[Dict[str, Alphabet]] = {}
+
+
+def register_alphabet(alphabet: Alphabet) -> Alphabet:
+    """
+    Adds an alphabet to the registry.
+
+    :param alphabet: The alphabet to be registered.
+    :return: The registered alphabet.
+    """
+    if ALPHABETS.get(alphabet.name, alphabet) != alphabet:
+        raise ValueError(f"Another alphabet is already registered as {alphabet.name}")
+
+    ALPHABETS[alphabet.name] = alphabet
+    return alphabet
+
+
+def get_alphabet(alphabet: Union[str, Alphabet]) -> Alphabet:
+    """
+    Looks up an alphabet in the registry.
+
+    :param alphabet: The name of a registered alphabet, or an alphabet itself.
+    :return: The alphabet.
+    """
+    if isinstance(alphabet, Alphabet):
+        return alphabet
+
+    try:
+        return ALPHABETS[alphabet]
+    except KeyError:
+        raise ValueError(f"Unknown alphabet: {alphabet}") from None
+
+
+def custom_alphabet(name: str, symbols: Symbols, padding: Symbols = " ") -> Alphabet:
+    """
+    Creates and registers an alphabet of arbitrary symbols.
+
+    :param name: The name to register the alphabet under.
+    :param symbols: The letters, or the byte values for a byte alphabet.
+    :param padding: The symbol used to fill incomplete cipher blocks.
+    :return: The registered alphabet.
+    """
+    if isinstance(symbols, bytes) and isinstance(padding, str):
+        padding = padding.encode("latin-1")
+
+    return register_alphabet(Alphabet(name=name, symbols=symbols, padding=padding))
+
+
+UKRAINIAN: Final[Alphabet] = register_alphabet(
+    Alphabet(name="ukrainian", symbols="абвгґдеєжзиіїйклмнопрстуфхцчшщьюя", padding=" ")
+)
+LATIN: Final[Alphabet] = register_alphabet(
+    Alphabet(name="latin", symbols="abcdefghijklmnopqrstuvwxyz", padding=" ")
+)
+BYTES: Final[Alphabet] = register_alphabet(
+    Alphabet(name="bytes", symbols=bytes(range(256)), padding=b"\x00")
+)
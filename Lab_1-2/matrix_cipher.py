@@ -1,5 +1,331 @@
 #!/usr/bin/python3
-from typing import List, Literal
+import mmap
+import os
+import struct
+from functools import lru_cache
+from itertools import repeat
+from operator import add, itemgetter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Final,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+# Imported relatively as a package, from the same directory as a script
+try:
+    from .alphabet import (
+        BYTES,
+        UKRAINIAN,
+        Alphabet,
+        BytesLike,
+        Message,
+        Symbols,
+        get_alphabet,
+    )
+except ImportError:
+    from alphabet import (
+        BYTES,
+        UKRAINIAN,
+        Alphabet,
+        BytesLike,
+        Message,
+        Symbols,
+        get_alphabet,
+    )
+
+# Header of an encrypted file: magic bytes and the length of the original file
+FILE_MAGIC: Final[bytes] = b"MXC1"
+FILE_HEADER: Final[struct.Struct] = struct.Struct(">4sQ")
+
+# Preferred number of bytes transposed per step in the file mode
+FILE_CHUNK_SIZE: Final[int] = 1 << 20
+
+
+class MatrixCipherPlan:
+    """
+    Precomputed gather indices of the matrix cipher for given keys and message length.
+    """
+
+    __slots__ = (
+        "column_key_indices",
+        "row_key_indices",
+        "num_columns",
+        "num_rows",
+        "_forward",
+        "_inverse",
+    )
+
+    def __init__(
+        self, column_key: Symbols, row_key: Symbols, message_length: int
+    ) -> None:
+        """
+        Initializes the plan, the gather indices are built on first use.
+
+        :param column_key: The key used for column transposition.
+        :param row_key: The key used for row transposition.
+        :param message_length: The length of the preprocessed message.
+        """
+        self.column_key_indices: Final[List[int]] = [
+            column_key.index(letter) for letter in sorted(column_key)
+        ]
+        self.row_key_indices: Final[List[int]] = [
+            row_key.index(letter) for letter in sorted(row_key)
+        ]
+
+        # Calculate the number of rows and colums, rounding up
+        self.num_columns: Final[int] = len(column_key)
+        self.num_rows: Final[int] = -(-message_length // self.num_columns)
+
+        self._forward: Optional[Tuple[Tuple[int, ...], Any]] = None
+        self._inverse: Optional[Tuple[Tuple[int, ...], Any]] = None
+
+    @property
+    def forward(self) -> Tuple[int, ...]:
+        """
+        The position in the padded message of every encrypted character.
+        """
+        if self._forward is None:
+            num_columns, num_rows = self.num_columns, self.num_rows
+
+            # Fill the matrix row by row with positions of the padded message,
+            # rearrange the columns and rows and read the result column by column
+            matrix: List[List[int]] = [
+                [row * num_columns + idx for idx in self.column_key_indices]
+                for row in range(num_rows)
+            ]
+            matrix = [matrix[idx] for idx in self.row_key_indices]
+            indices: Tuple[int, ...] = tuple(
+                matrix[row][column]
+                for column in range(num_columns)
+                for row in range(num_rows)
+            )
+            self._forward = indices, _gatherer(indices) if indices else None
+
+        return self._forward[0]
+
+    @property
+    def inverse(self) -> Tuple[int, ...]:
+        """
+        The position in the ciphertext of every decrypted character.
+        """
+        if self._inverse is None:
+            num_columns, num_rows = self.num_columns, self.num_rows
+
+            # The ciphertext fills the matrix column by column, every output
+            # cell is read through the first key position that moved it
+            column_positions: List[int] = _first_positions(
+                self.column_key_indices, num_columns if num_rows else 0
+            )
+            row_positions: List[int] = _first_positions(self.row_key_indices, num_rows)
+            indices: Tuple[int, ...] = tuple(
+                column_positions[column] * num_rows + row_positions[row]
+                for row in range(num_rows)
+                for column in range(num_columns)
+            )
+            self._inverse = indices, _gatherer(indices) if indices else None
+
+        return self._inverse[0]
+
+    def encrypt(self, message: Symbols, padding: Symbols = " ") -> Symbols:
+        """
+        Encrypts a preprocessed message of the planned length in one gather pass.
+
+        :param message: The text without spaces and case folded, or raw bytes.
+        :param padding: The symbol used to fill the incomplete last row.
+        :return: The encrypted text.
+        """
+        if not self.forward:
+            return message[:0]
+
+        # Pad the message to fill the whole matrix
+        padding = padding * (self.num_rows * self.num_columns - len(message))
+        return _join(self._forward[1](message + padding), like=message)
+
+    def decrypt(self, message: Symbols) -> Symbols:
+        """
+        Decrypts a message of the planned length in one gather pass.
+
+        :param message: The text to be decrypted, or raw bytes.
+        :return: The decrypted text.
+        """
+        if not self.inverse:
+            return message[:0]
+
+        return _join(self._inverse[1](message), like=message)
+
+    def encrypt_many(
+        self, messages: List[Symbols], padding: Symbols = " "
+    ) -> List[Symbols]:
+        """
+        Encrypts a batch of preprocessed messages of the planned length.
+
+        :param messages: The texts without spaces and case folded, or raw bytes.
+        :param padding: The symbol used to fill the incomplete last row.
+        :return: The encrypted texts.
+        """
+        if not self.forward:
+            return [message[:0] for message in messages]
+
+        # The same gather is mapped over the whole batch without a Python-level loop
+        padding = padding * (self.num_rows * self.num_columns - len(messages[0]))
+        padded: Iterator[Symbols] = map(add, messages, repeat(padding))
+        join: Callable[[Any], Symbols] = (
+            "".join if isinstance(messages[0], str) else bytes
+        )
+        return list(map(join, map(self._forward[1], padded)))
+
+    def decrypt_many(self, messages: List[Symbols]) -> List[Symbols]:
+        """
+        Decrypts a batch of messages of the planned length.
+
+        :param messages: The texts to be decrypted, or raw bytes.
+        :return: The decrypted texts.
+        """
+        if not self.inverse:
+            return [message[:0] for message in messages]
+
+        join: Callable[[Any], Symbols] = (
+            "".join if isinstance(messages[0], str) else bytes
+        )
+        return list(map(join, map(self._inverse[1], messages)))
+
+
+def _gatherer(indices: Tuple[int, ...]) -> Callable[[Symbols], Any]:
+    """
+    Builds a function picking the symbols at the given positions in one call.
+
+    :param indices: The positions to pick, at least one.
+    :return: The function, returning a sequence of symbols.
+    """
+    if len(indices) == 1:
+        # A single-item itemgetter would return the bare symbol instead of a sequence
+        (index,) = indices
+        return lambda message: (message[index],)
+    return itemgetter(*indices)
+
+
+def _join(symbols: Any, like: Symbols) -> Symbols:
+    """
+    Assembles gathered symbols into a message of the same type as the input.
+
+    :param symbols: Characters, or byte values.
+    :param like: The message the symbols were gathered from.
+    :return: The assembled message.
+    """
+    return "".join(symbols) if isinstance(like, str) else bytes(symbols)
+
+
+def _normalize_key(key: Union[str, BytesLike]) -> Symbols:
+    """
+    Removes spaces from a text key and converts it to lowercase.
+
+    :param key: The key, byte keys are taken as is.
+    :return: The preprocessed key.
+    """
+    if isinstance(key, str):
+        return key.replace(" ", "").lower()
+    return bytes(key)
+
+
+def _transpose_file(
+    source: mmap.mmap,
+    source_offset: int,
+    destination: mmap.mmap,
+    destination_offset: int,
+    length: int,
+    indices: Tuple[int, ...],
+    chunk_size: int,
+    padding: bytes,
+) -> None:
+    """
+    Applies a block permutation to a region of a mapped file, chunk by chunk.
+
+    Within a chunk of whole blocks, the bytes at the same position of every
+    block form a strided slice, so a block permutation becomes one strided
+    copy per block position instead of one operation per byte.
+
+    :param source: The mapped input file.
+    :param source_offset: The offset of the region in the input.
+    :param destination: The mapped output file.
+    :param destination_offset: The offset of the output region.
+    :param length: The number of bytes to read, the last block is padded.
+    :param indices: The gather indices of one block.
+    :param chunk_size: The number of bytes per step, a whole number of blocks.
+    :param padding: The byte used to fill the incomplete last block.
+    """
+    block_size: int = len(indices)
+    buffer: bytearray = bytearray(chunk_size)
+
+    for start in range(0, length, chunk_size):
+        chunk: bytes = source[
+            source_offset + start : source_offset + min(length, start + chunk_size)
+        ]
+        if len(chunk) % block_size:
+            chunk += padding * (block_size - len(chunk) % block_size)
+        if len(chunk) != len(buffer):
+            buffer = bytearray(len(chunk))
+
+        for position, index in enumerate(indices):
+            buffer[position::block_size] = chunk[index::block_size]
+
+        offset: int = destination_offset + start
+        destination[offset : offset + len(buffer)] = buffer
+
+
+def _first_positions(indices: List[int], size: int) -> List[int]:
+    """
+    Finds where every value first occurs in the list of sorted key indices.
+
+    :param indices: The key indices in sorted key order.
+    :param size: The number of values to look up.
+    :return: The position of the first occurrence of every value from 0 to size - 1.
+    """
+    positions: Dict[int, int] = {}
+    for position, idx in enumerate(indices):
+        positions.setdefault(idx, position)
+
+    try:
+        return [positions[value] for value in range(size)]
+    except KeyError as error:
+        raise ValueError(f"{error.args[0]} is not in list") from None
+
+
+def _batch_length(messages: List[Symbols]) -> int:
+    """
+    Checks that all messages of a batch have the same length.
+
+    :param messages: The messages of the batch.
+    :return: The common length of the messages.
+    """
+    length: int = len(messages[0])
+    if any(len(message) != length for message in messages):
+        raise ValueError("All messages of a batch must have the same length")
+
+    return length
+
+
+@lru_cache(maxsize=128)
+def compile_plan(
+    column_key: Symbols, row_key: Symbols, message_length: int
+) -> MatrixCipherPlan:
+    """
+    Returns the plan for the keys and message length, reusing recently compiled plans.
+
+    :param column_key: The key used for column transposition.
+    :param row_key: The key used for row transposition.
+    :param message_length: The length of the preprocessed message.
+    :return: The compiled plan.
+    """
+    return MatrixCipherPlan(
+        column_key=column_key, row_key=row_key, message_length=message_length
+    )
 
 
 class MatrixCipher:
@@ -8,99 +334,248 @@ class MatrixCipher:
     """
 
     @staticmethod
-    def encrypt(message: str, column_key: str, row_key: str) -> str:
+    def encrypt(
+        message: Message,
+        column_key: Message,
+        row_key: Message,
+        alphabet: Union[str, Alphabet] = UKRAINIAN,
+    ) -> Symbols:
         """
         Encrypts the input message using a column and row transposition cipher.
 
-        :param message: The text to be encrypted.
+        :param message: The text to be encrypted, or bytes for a byte alphabet.
         :param column_key: The key used for column transposition.
         :param row_key: The key used for row transposition.
+        :param alphabet: The alphabet or the name of a registered one.
         :return: The encrypted text.
         """
+        charset: Alphabet = get_alphabet(alphabet)
+
         # Preprocess the message, column_key and row_key removing spaces and converting to lowercase
-        message: str = message.replace(" ", "").lower()
-        column_key: str = column_key.replace(" ", "").lower()
-        row_key: str = row_key.replace(" ", "").lower()
+        message: Symbols = charset.normalize(message)
+        column_key: Symbols = _normalize_key(column_key)
+        row_key: Symbols = _normalize_key(row_key)
 
-        # Calculate the number of rows and colums, rounding up
-        num_columns: int = len(column_key)
-        num_rows: int = -(-len(message) // num_columns)
+        plan: MatrixCipherPlan = compile_plan(
+            column_key=column_key, row_key=row_key, message_length=len(message)
+        )
+        return plan.encrypt(message, padding=charset.padding)
 
-        # Initialize the matrix with spaces
-        matrix: List[List[str]] = [
-            [" " for _ in range(num_columns)] for _ in range(num_rows)
-        ]
+    @staticmethod
+    def decrypt(
+        message: Message,
+        column_key: Message,
+        row_key: Message,
+        alphabet: Union[str, Alphabet] = UKRAINIAN,
+    ) -> Symbols:
+        """
+        Decrypts the input message using a column and row transposition cipher.
 
-        # Fill the matrix with characters from the message
-        for i, char in enumerate(message):
-            matrix[i // num_columns][i % num_columns] = char
+        :param message: The text to be decrypted, or bytes for a byte alphabet.
+        :param column_key: The key used for column transposition.
+        :param row_key: The key used for row transposition.
+        :param alphabet: The alphabet or the name of a registered one.
+        :return: The decrypted text.
+        """
+        if get_alphabet(alphabet).is_bytes:
+            message: Symbols = bytes(message)
 
-        # Sort the column key and rearrange the columns
-        column_key_indices: List[int] = [
-            column_key.index(letter) for letter in sorted(column_key)
-        ]
-        matrix: List[List[str]] = [
-            [matrix[row][idx] for idx in column_key_indices] for row in range(num_rows)
-        ]
+        # Text keys are used as given, byte keys only need to be hashable
+        if not isinstance(column_key, str):
+            column_key = bytes(column_key)
+        if not isinstance(row_key, str):
+            row_key = bytes(row_key)
 
-        # Sort the row key and rearrange the rows
-        row_key_indices: List[int] = [
-            row_key.index(letter) for letter in sorted(row_key)
-        ]
-        matrix: List[List[str]] = [matrix[idx] for idx in row_key_indices]
+        plan: MatrixCipherPlan = compile_plan(
+            column_key=column_key, row_key=row_key, message_length=len(message)
+        )
+        return plan.decrypt(message)
 
-        # Create the encrypted text by reading the matrix column by column
-        result: str = "".join(
-            matrix[row][column]
-            for column in range(num_columns)
-            for row in range(num_rows)
+    @staticmethod
+    def encrypt_many(
+        messages: Iterable[Message],
+        column_key: Message,
+        row_key: Message,
+        alphabet: Union[str, Alphabet] = UKRAINIAN,
+    ) -> List[Symbols]:
+        """
+        Encrypts a batch of messages of equal length with the same keys.
+
+        :param messages: The texts to be encrypted, or bytes for a byte alphabet.
+        :param column_key: The key used for column transposition.
+        :param row_key: The key used for row transposition.
+        :param alphabet: The alphabet or the name of a registered one.
+        :return: The encrypted texts, in the order of the messages.
+        """
+        charset: Alphabet = get_alphabet(alphabet)
+
+        # Preprocess the messages, column_key and row_key removing spaces and converting to lowercase
+        messages: List[Symbols] = [charset.normalize(message) for message in messages]
+        column_key: Symbols = _normalize_key(column_key)
+        row_key: Symbols = _normalize_key(row_key)
+
+        if not messages:
+            return []
+
+        plan: MatrixCipherPlan = compile_plan(
+            column_key=column_key,
+            row_key=row_key,
+            message_length=_batch_length(messages),
         )
+        return plan.encrypt_many(messages, padding=charset.padding)
+
+    @staticmethod
+    def decrypt_many(
+        messages: Iterable[Message],
+        column_key: Message,
+        row_key: Message,
+        alphabet: Union[str, Alphabet] = UKRAINIAN,
+    ) -> List[Symbols]:
+        """
+        Decrypts a batch of messages of equal length with the same keys.
+
+        :param messages: The texts to be decrypted, or bytes for a byte alphabet.
+        :param column_key: The key used for column transposition.
+        :param row_key: The key used for row transposition.
+        :param alphabet: The alphabet or the name of a registered one.
+        :return: The decrypted texts, in the order of the messages.
+        """
+        if get_alphabet(alphabet).is_bytes:
+            messages: List[Symbols] = [bytes(message) for message in messages]
+        else:
+            messages: List[Symbols] = list(messages)
+
+        # Text keys are used as given, byte keys only need to be hashable
+        if not isinstance(column_key, str):
+            column_key = bytes(column_key)
+        if not isinstance(row_key, str):
+            row_key = bytes(row_key)
 
-        return result
+        if not messages:
+            return []
+
+        plan: MatrixCipherPlan = compile_plan(
+            column_key=column_key,
+            row_key=row_key,
+            message_length=_batch_length(messages),
+        )
+        return plan.decrypt_many(messages)
 
     @staticmethod
-    def decrypt(message: str, column_key: str, row_key: str) -> str:
+    def encrypt_file(
+        source: Union[str, os.PathLike],
+        destination: Union[str, os.PathLike],
+        column_key: Message,
+        row_key: Message,
+        chunk_size: int = FILE_CHUNK_SIZE,
+    ) -> None:
         """
-        Decrypts the input message using a column and row transposition cipher.
+        Encrypts a file block by block in the byte alphabet.
 
-        :param message: The text to be decrypted.
+        The input is split into matrices of len(row_key) rows and len(column_key)
+        columns, the last one padded with zero bytes. The input is memory-mapped,
+        the output is preallocated and written through a mapping, so at most one
+        chunk of blocks is held in memory.
+
+        :param source: The path of the file to be encrypted.
+        :param destination: The path of the encrypted file.
         :param column_key: The key used for column transposition.
         :param row_key: The key used for row transposition.
-        :return: The decrypted text.
+        :param chunk_size: The preferred number of bytes transposed per step.
         """
-        # Get the indices for rearranging columns and rows
-        column_key_indices: List[int] = [
-            column_key.index(letter) for letter in sorted(column_key)
-        ]
-        row_key_indices: List[int] = [
-            row_key.index(letter) for letter in sorted(row_key)
-        ]
+        column_key: Symbols = _normalize_key(column_key)
+        row_key: Symbols = _normalize_key(row_key)
 
-        num_columns: int = len(column_key)
+        block_size: int = len(column_key) * len(row_key)
+        plan: MatrixCipherPlan = compile_plan(
+            column_key=column_key, row_key=row_key, message_length=block_size
+        )
+        chunk_size = max(1, chunk_size // block_size) * block_size
 
-        # Calculate the number of rows, rounding up
-        num_rows: int = -(-len(message) // num_columns)
+        with open(source, "rb") as reader, open(destination, "w+b") as writer:
+            length: int = os.fstat(reader.fileno()).st_size
+            padded: int = -(-length // block_size) * block_size
 
-        # Initialize the matrix with spaces
-        matrix: List[List[str]] = [
-            [" " for _ in range(num_columns)] for _ in range(num_rows)
-        ]
+            # Preallocate the output and write it through a mapping
+            writer.truncate(FILE_HEADER.size + padded)
+            with mmap.mmap(writer.fileno(), FILE_HEADER.size + padded) as output:
+                output[: FILE_HEADER.size] = FILE_HEADER.pack(FILE_MAGIC, length)
+                if not length:
+                    return
 
-        # Fill the matrix with characters from the encrypted message
-        message_index: Literal[0] = 0
-        for column in range(num_columns):
-            for row in range(num_rows):
-                matrix[row][column] = message[message_index]
-                message_index += 1
-
-        # Extract characters from the matrix to get the decrypted message
-        decrypted_message: str = "".join(
-            matrix[row_key_indices.index(row)][column_key_indices.index(column)]
-            for row in range(num_rows)
-            for column in range(num_columns)
+                with mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    _transpose_file(
+                        source=data,
+                        source_offset=0,
+                        destination=output,
+                        destination_offset=FILE_HEADER.size,
+                        length=length,
+                        indices=plan.forward,
+                        chunk_size=chunk_size,
+                        padding=BYTES.padding,
+                    )
+
+    @staticmethod
+    def decrypt_file(
+        source: Union[str, os.PathLike],
+        destination: Union[str, os.PathLike],
+        column_key: Message,
+        row_key: Message,
+        chunk_size: int = FILE_CHUNK_SIZE,
+    ) -> None:
+        """
+        Decrypts a file produced by encrypt_file, restoring its exact length.
+
+        :param source: The path of the encrypted file.
+        :param destination: The path of the decrypted file.
+        :param column_key: The key used for column transposition.
+        :param row_key: The key used for row transposition.
+        :param chunk_size: The preferred number of bytes transposed per step.
+        """
+        column_key: Symbols = _normalize_key(column_key)
+        row_key: Symbols = _normalize_key(row_key)
+
+        block_size: int = len(column_key) * len(row_key)
+        plan: MatrixCipherPlan = compile_plan(
+            column_key=column_key, row_key=row_key, message_length=block_size
         )
+        chunk_size = max(1, chunk_size // block_size) * block_size
+
+        with open(source, "rb") as reader:
+            header: bytes = reader.read(FILE_HEADER.size)
+            if len(header) != FILE_HEADER.size:
+                raise ValueError("The file is not encrypted with the matrix cipher")
+            magic, length = FILE_HEADER.unpack(header)
+
+            padded: int = os.fstat(reader.fileno()).st_size - FILE_HEADER.size
+            if (
+                magic != FILE_MAGIC
+                or padded % block_size
+                or not 0 <= padded - length < block_size
+            ):
+                raise ValueError("The file is not encrypted with the matrix cipher")
+
+            with open(destination, "w+b") as writer:
+                if not padded:
+                    return
 
-        return decrypted_message
+                # Preallocate the output and write it through a mapping, the padding
+                # of the last block is cut off once the mapping is closed
+                writer.truncate(padded)
+                with mmap.mmap(writer.fileno(), padded) as output, mmap.mmap(
+                    reader.fileno(), 0, access=mmap.ACCESS_READ
+                ) as data:
+                    _transpose_file(
+                        source=data,
+                        source_offset=FILE_HEADER.size,
+                        destination=output,
+                        destination_offset=0,
+                        length=padded,
+                        indices=plan.inverse,
+                        chunk_size=chunk_size,
+                        padding=BYTES.padding,
+                    )
+                writer.truncate(length)
 
 
 def main() -> None:
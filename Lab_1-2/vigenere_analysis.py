@@ -0,0 +1,234 @@
+#!/usr/bin/python3
+import re
+from collections import Counter
+from typing import Dict, Final, List, Optional
+
+# Imported relatively as a package, from the same directory as a script
+try:
+    from .vigenere_cipher import VigenereCipher
+except ImportError:
+    from vigenere_cipher import VigenereCipher
+
+# Relative frequencies of the letters in Ukrainian texts, in percent
+UKRAINIAN_FREQUENCIES: Final[Dict[str, float]] = {
+    "а": 7.2,
+    "б": 1.7,
+    "в": 5.2,
+    "г": 1.6,
+    "ґ": 0.01,
+    "д": 3.5,
+    "е": 4.7,
+    "є": 0.6,
+    "ж": 0.9,
+    "з": 2.3,
+    "и": 6.1,
+    "і": 5.8,
+    "ї": 0.6,
+    "й": 0.9,
+    "к": 3.5,
+    "л": 3.6,
+    "м": 3.1,
+    "н": 6.5,
+    "о": 9.4,
+    "п": 2.9,
+    "р": 4.7,
+    "с": 4.1,
+    "т": 5.5,
+    "у": 4.0,
+    "ф": 0.3,
+    "х": 1.2,
+    "ц": 1.0,
+    "ч": 1.8,
+    "ш": 0.8,
+    "щ": 0.5,
+    "ь": 2.9,
+    "ю": 0.8,
+    "я": 3.0,
+}
+
+# Byte standing in for characters outside the alphabet: they are not counted,
+# but they still occupy a key position, exactly as in VigenereCipher
+SENTINEL: Final[int] = 0xFF
+
+# The Kasiski examination walks the n-grams one by one, a prefix of this many
+# characters already gives stable distance statistics
+KASISKI_LIMIT: Final[int] = 1 << 17
+
+
+class VigenereAnalyzer:
+    """
+    A class for recovering the key of a Vigenere cipher from the ciphertext alone.
+    """
+
+    def __init__(
+        self,
+        ciphertext: str,
+        alphabet: Optional[str] = None,
+        frequencies: Dict[str, float] = UKRAINIAN_FREQUENCIES,
+    ) -> None:
+        """
+        Initializes the analyzer and encodes the ciphertext as letter indices.
+
+        :param ciphertext: The text produced by VigenereCipher.encrypt.
+        :param alphabet: The alphabet of the cipher, Ukrainian by default.
+        :param frequencies: The letter frequencies of the plaintext language.
+        """
+        self.alphabet: Final[str] = alphabet or VigenereCipher().alphabet
+
+        total: float = sum(frequencies.values())
+        self.frequencies: Final[List[float]] = [
+            frequencies.get(letter, 0.0) / total for letter in self.alphabet
+        ]
+
+        # One byte per character: the letter index, or SENTINEL for anything else.
+        # All further scans run over this buffer with C-level bytes operations
+        text: str = ciphertext.replace(" ", "").lower()
+        text = re.sub(f"[^{re.escape(self.alphabet)}]", chr(SENTINEL), text)
+        table: Dict[int, int] = {ord(char): i for i, char in enumerate(self.alphabet)}
+        self.data: Final[bytes] = text.translate(table).encode("latin-1")
+
+        self._letters: Final[List[bytes]] = [
+            bytes((i,)) for i in range(len(self.alphabet))
+        ]
+
+    def letter_counts(self, period: int, offset: int) -> List[int]:
+        """
+        Counts the letters standing at one key position.
+
+        :param period: The assumed key length.
+        :param offset: The key position, from 0 to period - 1.
+        :return: The number of occurrences of every letter of the alphabet.
+        """
+        column: bytes = self.data[offset::period]
+        return [column.count(letter) for letter in self._letters]
+
+    def index_of_coincidence(self, period: int) -> float:
+        """
+        Computes the average index of coincidence of the columns for a key length.
+
+        :param period: The assumed key length.
+        :return: The index of coincidence, close to the language value for the right key length.
+        """
+        indices: List[float] = []
+        for offset in range(period):
+            counts: List[int] = self.letter_counts(period=period, offset=offset)
+            total: int = sum(counts)
+            if total > 1:
+                indices.append(
+                    sum(count * (count - 1) for count in counts) / (total * (total - 1))
+                )
+
+        return sum(indices) / len(indices) if indices else 0.0
+
+    def kasiski(
+        self, max_period: int = 20, ngram: int = 3, limit: int = KASISKI_LIMIT
+    ) -> Dict[int, int]:
+        """
+        Performs the Kasiski examination of the repeated n-grams.
+
+        :param max_period: The largest key length to consider.
+        :param ngram: The length of the repeated fragments.
+        :param limit: The number of leading characters to examine.
+        :return: For every key length, the number of repetition distances it divides.
+        """
+        sentinel: bytes = bytes((SENTINEL,))
+        last_seen: Dict[bytes, int] = {}
+        distances: Counter = Counter()
+
+        data: bytes = self.data[:limit]
+        for i in range(len(data) - ngram + 1):
+            fragment: bytes = data[i : i + ngram]
+            if sentinel in fragment:
+                continue
+            previous: Optional[int] = last_seen.get(fragment)
+            if previous is not None:
+                distances[i - previous] += 1
+            last_seen[fragment] = i
+
+        return {
+            period: sum(
+                count for distance, count in distances.items() if distance % period == 0
+            )
+            for period in range(2, max_period + 1)
+        }
+
+    def key_length(self, max_period: int = 20, tolerance: float = 0.9) -> int:
+        """
+        Estimates the key length.
+
+        The candidates are the key lengths whose index of coincidence is close to
+        the best one, and the Kasiski examination picks among them, which rejects
+        the multiples of the true key length.
+
+        :param max_period: The largest key length to consider.
+        :param tolerance: The fraction of the best index of coincidence a candidate must reach.
+        :return: The most probable key length.
+        """
+        max_period = max(1, min(max_period, len(self.data) // 2))
+        scores: Dict[int, float] = {
+            period: self.index_of_coincidence(period=period)
+            for period in range(1, max_period + 1)
+        }
+        best: float = max(scores.values())
+        candidates: List[int] = [
+            period for period, score in scores.items() if score >= best * tolerance
+        ]
+        if len(candidates) == 1:
+            return candidates[0]
+
+        support: Dict[int, int] = self.kasiski(max_period=max_period)
+        return max(candidates, key=lambda period: (support.get(period, 0), -period))
+
+    def recover_key(self, key_length: Optional[int] = None) -> str:
+        """
+        Recovers the key by chi-squared matching of every column against the language.
+
+        :param key_length: The key length, estimated when not given.
+        :return: The recovered key.
+        """
+        period: int = key_length or self.key_length()
+        size: int = len(self.alphabet)
+
+        key: List[str] = []
+        for offset in range(period):
+            counts: List[int] = self.letter_counts(period=period, offset=offset)
+            total: int = sum(counts) or 1
+            expected: List[float] = [total * f or 1e-9 for f in self.frequencies]
+
+            shift: int = min(
+                range(size),
+                key=lambda s: sum(
+                    (counts[(i + s) % size] - expected[i]) ** 2 / expected[i]
+                    for i in range(size)
+                ),
+            )
+            key.append(self.alphabet[shift])
+
+        return "".join(key)
+
+
+def main() -> None:
+    message = (
+        "Як умру, то поховайте мене на могилі, серед степу широкого, "
+        "на Вкраїні милій, щоб лани широкополі, і Дніпро, і кручі було видно, "
+        "було чути, як реве ревучий. Як понесе з України у синєє море кров "
+        "ворожу, отойді я і лани і гори все покину, і полину до самого Бога "
+        "молитися, а до того я не знаю Бога. Поховайте та вставайте, кайдани "
+        "порвіте і вражою злою кров'ю волю окропіте. І мене в сем'ї великій, "
+        "в сем'ї вольній, новій, не забудьте пом'янути незлим тихим словом."
+    )
+    key = "кобзар"
+
+    ciphertext: str = VigenereCipher().encrypt(message=message, key=key)
+    analyzer: VigenereAnalyzer = VigenereAnalyzer(ciphertext=ciphertext)
+    key_length: int = analyzer.key_length()
+
+    return print(
+        f"Ciphertext: {ciphertext}\n"
+        f"Key length: {key_length}\n"
+        f"Recovered key: {analyzer.recover_key(key_length=key_length)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
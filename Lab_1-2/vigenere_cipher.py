@@ -1,5 +1,103 @@
 #!/usr/bin/python3
-from typing import Final, Literal
+from functools import lru_cache
+from itertools import cycle
+from typing import IO, Any, Final, Iterable, Iterator, List, Literal, Tuple, Union
+
+# Imported relatively as a package, from the same directory as a script
+try:
+    from .alphabet import UKRAINIAN, Alphabet, Message, Symbols, get_alphabet
+except ImportError:
+    from alphabet import UKRAINIAN, Alphabet, Message, Symbols, get_alphabet
+
+# Number of characters read from a stream per step of the streaming API
+CHUNK_SIZE: Final[int] = 1 << 16
+
+
+class VigenereKey:
+    """
+    A Vigenere key compiled into one substitution table per key position.
+    """
+
+    __slots__ = ("key", "alphabet", "encrypt_tables", "decrypt_tables")
+
+    def __init__(self, key: Symbols, alphabet: Alphabet) -> None:
+        """
+        Compiles the key against the alphabet.
+
+        :param key: The preprocessed key.
+        :param alphabet: The alphabet the key letters are taken from.
+        """
+        if not key:
+            raise ValueError("The key must not be empty")
+
+        try:
+            shifts: List[int] = [alphabet.indices[letter] for letter in key]
+        except KeyError as error:
+            raise ValueError(f"{error.args[0]!r} is not in the alphabet") from None
+
+        symbols: Symbols = alphabet.symbols
+        shifted: List[Symbols] = [symbols[shift:] + symbols[:shift] for shift in shifts]
+
+        self.key: Final[Symbols] = key
+        self.alphabet: Final[Alphabet] = alphabet
+
+        # Byte alphabets get bytes.translate tables, text alphabets get dicts
+        if alphabet.is_bytes:
+            self.encrypt_tables: Final[Tuple[Any, ...]] = tuple(
+                bytes.maketrans(symbols, row) for row in shifted
+            )
+            self.decrypt_tables: Final[Tuple[Any, ...]] = tuple(
+                bytes.maketrans(row, symbols) for row in shifted
+            )
+        else:
+            self.encrypt_tables = tuple(dict(zip(symbols, row)) for row in shifted)
+            self.decrypt_tables = tuple(dict(zip(row, symbols)) for row in shifted)
+
+    def apply(
+        self, chunk: Symbols, decrypt: bool, key_index: int = 0
+    ) -> Tuple[Symbols, int]:
+        """
+        Applies the key to a preprocessed chunk.
+
+        :param chunk: The chunk without spaces and case folded, or raw bytes.
+        :param decrypt: True for decryption, False for encryption.
+        :param key_index: The position in the key at which the chunk starts.
+        :return: The processed chunk and the key position for the next chunk.
+        """
+        tables = self.decrypt_tables if decrypt else self.encrypt_tables
+        period: int = len(tables)
+        next_index: int = (key_index + len(chunk)) % period
+
+        # Rotate the tables so that the first one belongs to the first character
+        tables = tables[key_index:] + tables[:key_index]
+
+        if self.alphabet.is_bytes:
+            # Every period-th byte is shifted by the same key letter,
+            # so each stride is a single bytes.translate pass
+            result: bytearray = bytearray(chunk)
+            for offset, table in enumerate(tables[: len(chunk)]):
+                result[offset::period] = chunk[offset::period].translate(table)
+            return self.alphabet.join(result), next_index
+
+        # Characters outside the alphabet are passed through unchanged
+        return (
+            self.alphabet.join(
+                [table.get(char, char) for table, char in zip(cycle(tables), chunk)]
+            ),
+            next_index,
+        )
+
+
+@lru_cache(maxsize=64)
+def compile_key(key: Symbols, alphabet: Alphabet) -> VigenereKey:
+    """
+    Returns the compiled form of the key, reusing recently compiled keys.
+
+    :param key: The preprocessed key.
+    :param alphabet: The alphabet the key letters are taken from.
+    :return: The compiled key.
+    """
+    return VigenereKey(key=key, alphabet=alphabet)
 
 
 class VigenereCipher:
@@ -7,28 +105,32 @@ class VigenereCipher:
     A class for encrypting and decrypting messages using a Vigenere cipher.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, alphabet: Union[str, Alphabet] = UKRAINIAN) -> None:
         """
         Initializes the VigenereCipher object and sets the alphabet.
+
+        :param alphabet: The alphabet or the name of a registered one.
         """
-        self.alphabet: Final[str] = "абвгґдеєжзиіїйклмнопрстуфхцчшщьюя"
+        self.charset: Final[Alphabet] = get_alphabet(alphabet)
+        self.alphabet: Final[Symbols] = self.charset.symbols
 
-    def _shift_char(self, char: str, shift: int) -> str:
+    def _apply_chunk(
+        self, chunk: Message, key: Message, decrypt: bool, key_index: int
+    ) -> Tuple[Symbols, int]:
         """
-        Shifts a character by a certain number of positions in the defined alphabet.
+        Applies the Vigenere cipher to an already preprocessed chunk of text.
 
-        :param char: The character to shift.
-        :param shift: The number of positions to shift (can be negative).
-        :return: The shifted characted.
+        :param chunk: The chunk without spaces and case folded.
+        :param key: The preprocessed key.
+        :param decrypt: True for decryption, False for encryption.
+        :param key_index: The position in the key at which the chunk starts.
+        :return: The processed chunk and the key position for the next chunk.
         """
-        if char in self.alphabet:
-            current_index: int = self.alphabet.index(char)
-            new_index: int = (current_index + shift) % len(self.alphabet)
-            return self.alphabet[new_index]
-        else:
-            return char
+        return compile_key(key=key, alphabet=self.charset).apply(
+            chunk=chunk, decrypt=decrypt, key_index=key_index
+        )
 
-    def _apply_cipher(self, message: str, key: str, decrypt: bool) -> str:
+    def _apply_cipher(self, message: Message, key: Message, decrypt: bool) -> Symbols:
         """
         Applies the Vigenere cipher to the given message using the provided key.
 
@@ -37,22 +139,61 @@ class VigenereCipher:
         :param decrypt: True for decryption, False for encryption.
         :return: The result of the encryption or decryption.
         """
-        message: str = message.replace(" ", "").lower()
-        key: str = key.replace(" ", "").lower()
+        message: Symbols = self.charset.normalize(message)
+        key: Symbols = self.charset.normalize(key)
 
-        result: list = []
+        result, _ = self._apply_chunk(
+            chunk=message, key=key, decrypt=decrypt, key_index=0
+        )
+        return result
+
+    def _iter_cipher(
+        self, chunks: Iterable[Message], key: Message, decrypt: bool
+    ) -> Iterator[Symbols]:
+        """
+        Lazily applies the Vigenere cipher to a sequence of text chunks.
+
+        The key position is carried from one chunk to the next, so the joined
+        output is identical to processing the concatenated chunks at once.
+
+        :param chunks: The chunks of the message.
+        :param key: The key to be used for encryption or decryption.
+        :param decrypt: True for decryption, False for encryption.
+        :return: An iterator over the processed chunks.
+        """
+        key: Symbols = self.charset.normalize(key)
         key_index: Literal[0] = 0
 
-        for char in message:
-            shift: int = self.alphabet.index(key[key_index])
-            shifted_char: str = self._shift_char(char, -shift if decrypt else shift)
-            result.append(shifted_char)
+        for chunk in chunks:
+            result, key_index = self._apply_chunk(
+                chunk=self.charset.normalize(chunk),
+                key=key,
+                decrypt=decrypt,
+                key_index=key_index,
+            )
+            if result:
+                yield result
 
-            key_index = (key_index + 1) % len(key)
+    def _apply_stream(
+        self, reader: IO, writer: IO, key: Message, decrypt: bool, chunk_size: int
+    ) -> None:
+        """
+        Applies the Vigenere cipher to a stream, one chunk at a time.
 
-        return "".join(result)
+        :param reader: The stream to read the message from.
+        :param writer: The stream to write the result to.
+        :param key: The key to be used for encryption or decryption.
+        :param decrypt: True for decryption, False for encryption.
+        :param chunk_size: The number of characters (or bytes) read per step.
+        """
+        # An empty read of the same type as the alphabet marks the end of the stream
+        chunks: Iterator[Symbols] = iter(
+            lambda: reader.read(chunk_size), self.alphabet[:0]
+        )
+        for result in self._iter_cipher(chunks=chunks, key=key, decrypt=decrypt):
+            writer.write(result)
 
-    def encrypt(self, message: str, key: str) -> str:
+    def encrypt(self, message: Message, key: Message) -> Symbols:
         """
         Encrypts the given message using the Vigenere cipher.
 
@@ -62,7 +203,7 @@ class VigenereCipher:
         """
         return self._apply_cipher(message=message, key=key, decrypt=False)
 
-    def decrypt(self, message: str, key: str) -> str:
+    def decrypt(self, message: Message, key: Message) -> Symbols:
         """
         Decrypts the given message using the Vigenere cipher.
 
@@ -72,6 +213,60 @@ class VigenereCipher:
         """
         return self._apply_cipher(message=message, key=key, decrypt=True)
 
+    def iter_encrypt(
+        self, chunks: Iterable[Message], key: Message
+    ) -> Iterator[Symbols]:
+        """
+        Lazily encrypts a message given as a sequence of chunks.
+
+        :param chunks: The chunks of the message to be encrypted.
+        :param key: The key to be used for encryption.
+        :return: An iterator over the encrypted chunks.
+        """
+        return self._iter_cipher(chunks=chunks, key=key, decrypt=False)
+
+    def iter_decrypt(
+        self, chunks: Iterable[Message], key: Message
+    ) -> Iterator[Symbols]:
+        """
+        Lazily decrypts a message given as a sequence of chunks.
+
+        :param chunks: The chunks of the message to be decrypted.
+        :param key: The key to be used for decryption.
+        :return: An iterator over the decrypted chunks.
+        """
+        return self._iter_cipher(chunks=chunks, key=key, decrypt=True)
+
+    def encrypt_stream(
+        self, reader: IO, writer: IO, key: Message, chunk_size: int = CHUNK_SIZE
+    ) -> None:
+        """
+        Encrypts a text or binary stream, keeping at most one chunk in memory.
+
+        :param reader: The stream to read the message from.
+        :param writer: The stream to write the encrypted message to.
+        :param key: The key to be used for encryption.
+        :param chunk_size: The number of characters (or bytes) read per step.
+        """
+        return self._apply_stream(
+            reader=reader, writer=writer, key=key, decrypt=False, chunk_size=chunk_size
+        )
+
+    def decrypt_stream(
+        self, reader: IO, writer: IO, key: Message, chunk_size: int = CHUNK_SIZE
+    ) -> None:
+        """
+        Decrypts a text or binary stream, keeping at most one chunk in memory.
+
+        :param reader: The stream to read the encrypted message from.
+        :param writer: The stream to write the decrypted message to.
+        :param key: The key to be used for decryption.
+        :param chunk_size: The number of characters (or bytes) read per step.
+        """
+        return self._apply_stream(
+            reader=reader, writer=writer, key=key, decrypt=True, chunk_size=chunk_size
+        )
+
 
 def main() -> None:
     message, key = "Наступаємо на світанку", "Віженер"
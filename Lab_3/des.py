@@ -1,16 +1,18 @@
 #!/usr/bin/python3
-from typing import Dict, List
+from typing import Any, Callable, Dict, List, Optional
 
 from constant import (
     exp_d,
     final_perm,
     initial_perm,
-    key_comp,
-    keyp,
     per,
     sbox,
-    shift_table,
 )
+from des_engine import DESKey
+from permutation import compile_permutation
+
+# An observer receives the name of a stage, the round number and the state
+RoundObserver = Callable[[str, int, Dict[str, Any]], None]
 
 
 def hex2bin(s: str) -> str:
@@ -119,10 +121,8 @@ def permute(k: str, arr: List[int], n: int) -> str:
     :param n: Length of the permutation array.
     :return: Permuted binary string.
     """
-    permutation = ""
-    for i in range(0, n):
-        permutation = permutation + k[arr[i] - 1]
-    return permutation
+    # The table is compiled into byte lookups on first use
+    return compile_permutation(arr[:n], len(k)).permute_str(k)
 
 
 def shift_left(k: str, nth_shifts: int) -> str:
@@ -160,20 +160,48 @@ def xor(a: str, b: str) -> str:
     return ans
 
 
-def encrypt(pt: str, rkb: List[str], rk: List[str]) -> str:
+def print_round(stage: str, round_num: int, state: Dict[str, Any]) -> None:
+    """
+    Print the intermediate values of DES, an observer for encrypt.
+
+    :param stage: "initial_permutation" or "round".
+    :param round_num: The round number, 0 for the initial permutation.
+    :param state: The binary halves or block and the hexadecimal round key.
+    """
+    if stage == "initial_permutation":
+        print("After initial permutation", bin2hex(state["block"]))
+    elif stage == "round":
+        print(
+            "Round ",
+            round_num,
+            " ",
+            bin2hex(state["left"]),
+            " ",
+            bin2hex(state["right"]),
+            " ",
+            state["round_key"],
+        )
+
+
+def encrypt(
+    pt: str, rkb: List[str], rk: List[str], observer: Optional[RoundObserver] = None
+) -> str:
     """
     Encrypt a plaintext using the DES algorithm.
 
     :param pt: Plaintext in hexadecimal format.
     :param rkb: Round keys in binary format.
     :param rk: Round keys in hexadecimal format.
+    :param observer: Called with the state after the initial permutation and
+        after every round. Nothing is formatted when it is not given.
     :return: Cipher text in hexadecimal format.
     """
     pt = hex2bin(pt)
 
     # Initial Permutation
     pt = permute(pt, initial_perm, 64)
-    print("After initial permutation", bin2hex(pt))
+    if observer is not None:
+        observer("initial_permutation", 0, {"block": pt})
 
     # Splitting
     left = pt[0:32]
@@ -210,7 +238,8 @@ def encrypt(pt: str, rkb: List[str], rk: List[str]) -> str:
         # Swapper
         if i != 15:
             left, right = right, left
-        print("Round ", i + 1, " ", bin2hex(left), " ", bin2hex(right), " ", rk[i])
+        if observer is not None:
+            observer("round", i + 1, {"left": left, "right": right, "round_key": rk[i]})
 
     # Combination
     combine = left + right
@@ -224,38 +253,19 @@ def main() -> None:
     pt = "123456ABCD132536"
     key = "AABB09182736CCDD"
 
-    key = hex2bin(key)
-    # getting 56 bit key from 64 bit using the parity bits
-    key = permute(key, keyp, 56)
-
-    # Splitting
-    left = key[0:28]  # rkb for RoundKeys in binary
-    right = key[28:56]  # rk for RoundKeys in hexadecimal
-
-    rkb: list = []
-    rk: list = []
-    for i in range(0, 16):
-        # Shifting the bits by nth shifts by checking from shift table
-        left = shift_left(left, shift_table[i])
-        right = shift_left(right, shift_table[i])
-
-        # Combination of left and right string
-        combine_str = left + right
-
-        # Compression of key from 56 to 48 bits
-        round_key = permute(combine_str, key_comp, 48)
-
-        rkb.append(round_key)
-        rk.append(bin2hex(round_key))
+    # Round keys are derived once and cached, in both orderings
+    round_keys = DESKey.from_bytes(bytes.fromhex(key))
+    rkb = round_keys.round_keys_bin()  # rkb for RoundKeys in binary
+    rk = round_keys.round_keys_hex()  # rk for RoundKeys in hexadecimal
 
     print("Encryption")
-    cipher_text = bin2hex(encrypt(pt, rkb, rk))
+    cipher_text = bin2hex(encrypt(pt, rkb, rk, observer=print_round))
     print("Cipher Text : ", cipher_text)
 
     print("Decryption")
-    rkb_rev = rkb[::-1]
-    rk_rev = rk[::-1]
-    text = bin2hex(encrypt(cipher_text, rkb_rev, rk_rev))
+    rkb_rev = round_keys.round_keys_bin(decrypt=True)
+    rk_rev = round_keys.round_keys_hex(decrypt=True)
+    text = bin2hex(encrypt(cipher_text, rkb_rev, rk_rev, observer=print_round))
     print("Plain Text : ", text)
 
 
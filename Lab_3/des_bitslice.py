@@ -0,0 +1,313 @@
+#!/usr/bin/python3
+from typing import Callable, Dict, Final, List, Optional, Sequence, Tuple
+
+from constant import exp_d, final_perm, initial_perm, per, sbox
+from des_engine import round_keys
+
+Lanes = List[int]
+SBoxCircuit = Callable[[int, int, int, int, int, int, int], Tuple[int, int, int, int]]
+
+# Number of blocks sliced into the lanes at once
+BATCH_SIZE: Final[int] = 1 << 14
+
+
+def key_lane_map() -> Tuple[Tuple[int, ...], ...]:
+    """
+    Trace every round key bit back to the key bit it is taken from.
+
+    The key schedule only moves bits around, so the round key lanes of any
+    number of keys are a renaming of the key lanes.
+
+    :return: For every round, the 0-based key bit of each of the 48 round key bits.
+    """
+    rounds: List[List[int]] = [[0] * 48 for _ in range(16)]
+    for bit in range(64):
+        for lanes, subkey in zip(rounds, round_keys(1 << (63 - bit))):
+            for position in range(48):
+                if (subkey >> (47 - position)) & 1:
+                    lanes[position] = bit
+    return tuple(tuple(lanes) for lanes in rounds)
+
+
+def minterms(a: int, b: int, c: int, ones: int) -> Lanes:
+    """
+    Decode three lanes into their eight minterms.
+
+    :param a: The lane of the top bit.
+    :param b: The lane of the middle bit.
+    :param c: The lane of the bottom bit.
+    :param ones: The lane with all block positions set.
+    :return: The lanes where the three bits are 0, 1, ..., 7.
+    """
+    na, nb, nc = a ^ ones, b ^ ones, c ^ ones
+    low = (nb & nc, nb & c, b & nc, b & c)
+    return [na & term for term in low] + [a & term for term in low]
+
+
+def sbox_circuit(j: int) -> SBoxCircuit:
+    """
+    Derive a boolean circuit evaluating one S-box on bitsliced lanes.
+
+    The six inputs are split into two halves decoded into eight minterms each.
+    Every output bit is the OR, over the minterms of the first half, of that
+    minterm AND a function of the second half, and these functions are built
+    once as ORs of minterms and shared between the four output bits.
+
+    :param j: The index of the S-box.
+    :return: A function of the six input lanes, the first being bit 1, and the
+        all-ones lane, returning the four output lanes.
+    """
+    # The shared functions of the second half: the index of each by its truth
+    # table, and the minterms each one ORs together
+    functions: Dict[int, int] = {}
+    gates: List[Tuple[int, ...]] = []
+
+    # For every output bit, the minterms of the first half with their function,
+    # None standing for the function that is always true
+    outputs: List[List[Tuple[int, Optional[int]]]] = []
+    for bit in range(4):
+        terms: List[Tuple[int, Optional[int]]] = []
+        for high in range(8):
+            truth = 0
+            for low in range(8):
+                value = (high << 3) | low
+                row = ((value >> 4) & 2) | (value & 1)
+                col = (value >> 1) & 15
+                truth |= ((sbox[j][row][col] >> (3 - bit)) & 1) << low
+            if not truth:
+                continue
+
+            if truth == 0xFF:
+                terms.append((high, None))
+                continue
+            if truth not in functions:
+                functions[truth] = len(gates)
+                gates.append(tuple(low for low in range(8) if truth >> low & 1))
+            terms.append((high, functions[truth]))
+        outputs.append(terms)
+
+    def circuit(
+        x0: int, x1: int, x2: int, x3: int, x4: int, x5: int, ones: int
+    ) -> Tuple[int, int, int, int]:
+        """
+        Evaluate the S-box on bitsliced lanes.
+
+        :param x0: The lane of input bit 1.
+        :param x1: The lane of input bit 2.
+        :param x2: The lane of input bit 3.
+        :param x3: The lane of input bit 4.
+        :param x4: The lane of input bit 5.
+        :param x5: The lane of input bit 6.
+        :param ones: The lane with all block positions set.
+        :return: The four output lanes.
+        """
+        first = minterms(x0, x1, x2, ones)
+        second = minterms(x3, x4, x5, ones)
+
+        shared: Lanes = []
+        for gate in gates:
+            lane = 0
+            for low in gate:
+                lane |= second[low]
+            shared.append(lane)
+
+        y: Lanes = []
+        for terms in outputs:
+            lane = 0
+            for high, function in terms:
+                lane |= (
+                    first[high] if function is None else first[high] & shared[function]
+                )
+            y.append(lane)
+        return y[0], y[1], y[2], y[3]
+
+    return circuit
+
+
+KEY_LANES: Final[Tuple[Tuple[int, ...], ...]] = key_lane_map()
+SBOX_CIRCUITS: Final[Tuple[SBoxCircuit, ...]] = tuple(sbox_circuit(j) for j in range(8))
+
+# The permutations become renamings of the lanes
+IP_LANES: Final[Tuple[int, ...]] = tuple(position - 1 for position in initial_perm)
+FP_LANES: Final[Tuple[int, ...]] = tuple(position - 1 for position in final_perm)
+E_LANES: Final[Tuple[int, ...]] = tuple(position - 1 for position in exp_d)
+P_LANES: Final[Tuple[int, ...]] = tuple(position - 1 for position in per)
+
+
+def to_lanes(data: bytes, count: int) -> Lanes:
+    """
+    Transpose blocks into bit lanes.
+
+    Lane i holds bit i + 1 of every block, the first block being its most
+    significant bit. The transposition is a strided slice of the binary string.
+
+    :param data: The blocks joined together.
+    :param count: The number of blocks.
+    :return: The 64 lanes.
+    """
+    bits = format(int.from_bytes(data, "big"), f"0{64 * count}b")
+    return [int(bits[i::64], 2) for i in range(64)]
+
+
+def from_lanes(lanes: Lanes, count: int) -> bytes:
+    """
+    Transpose bit lanes back into blocks.
+
+    :param lanes: The 64 lanes.
+    :param count: The number of blocks.
+    :return: The blocks joined together.
+    """
+    bits = bytearray(64 * count)
+    for i, lane in enumerate(lanes):
+        bits[i::64] = format(lane, f"0{count}b").encode("ascii")
+    return int(bits, 2).to_bytes(8 * count, "big")
+
+
+def crypt_lanes(lanes: Lanes, key_lanes: Lanes, ones: int, decrypt: bool) -> Lanes:
+    """
+    Run DES over bitsliced blocks.
+
+    :param lanes: The 64 lanes of the input blocks.
+    :param key_lanes: The 64 lanes of the keys, one key per block position.
+    :param ones: The lane with all block positions set.
+    :param decrypt: True for decryption, False for encryption.
+    :return: The 64 lanes of the output blocks.
+    """
+    subkeys: List[List[int]] = [
+        [key_lanes[bit] for bit in positions] for positions in KEY_LANES
+    ]
+    if decrypt:
+        subkeys.reverse()
+
+    # Initial permutation
+    block = [lanes[i] for i in IP_LANES]
+    left, right = block[:32], block[32:]
+
+    for subkey in subkeys:
+        # Expansion D-box and XOR with the round key
+        x = [right[i] ^ k for i, k in zip(E_LANES, subkey)]
+
+        # S-boxes
+        s: Lanes = []
+        for j, circuit in enumerate(SBOX_CIRCUITS):
+            s += circuit(*x[6 * j : 6 * j + 6], ones)
+
+        # Straight D-box and XOR with the left half
+        left, right = right, [l ^ s[i] for l, i in zip(left, P_LANES)]
+
+    # Undo the last swap and apply the final permutation
+    block = right + left
+    return [block[i] for i in FP_LANES]
+
+
+class BitslicedDES:
+    """
+    A DES implementation encrypting many blocks at once.
+
+    Bit i of every block is kept in lane i, a Python integer with one bit per
+    block, so one bitwise operation acts on all the blocks. The S-boxes are
+    evaluated as boolean circuits and the permutations cost nothing.
+    """
+
+    block_size: Final[int] = 8
+
+    def __init__(self, key: bytes) -> None:
+        """
+        Initialize the engine with a key.
+
+        :param key: The 8-byte DES key.
+        """
+        if len(key) != 8:
+            raise ValueError("DES key must be 8 bytes long")
+        self.key: Final[bytes] = bytes(key)
+
+    def _crypt(self, blocks: Sequence[bytes], decrypt: bool) -> List[bytes]:
+        """
+        Encrypt or decrypt blocks in batches of BATCH_SIZE.
+
+        :param blocks: The 8-byte input blocks.
+        :param decrypt: True for decryption, False for encryption.
+        :return: The output blocks.
+        """
+        if any(len(block) != 8 for block in blocks):
+            raise ValueError("DES block must be 8 bytes long")
+
+        key = int.from_bytes(self.key, "big")
+        output: List[bytes] = []
+        for start in range(0, len(blocks), BATCH_SIZE):
+            batch = blocks[start : start + BATCH_SIZE]
+            count = len(batch)
+            ones = (1 << count) - 1
+
+            # The same key in every block position
+            key_lanes = [ones if (key >> (63 - i)) & 1 else 0 for i in range(64)]
+            lanes = crypt_lanes(
+                to_lanes(b"".join(batch), count), key_lanes, ones, decrypt
+            )
+
+            data = from_lanes(lanes, count)
+            output += [data[i : i + 8] for i in range(0, len(data), 8)]
+        return output
+
+    def encrypt_blocks(self, blocks: Sequence[bytes]) -> List[bytes]:
+        """
+        Encrypt 8-byte blocks independently, as in ECB mode.
+
+        :param blocks: The plaintext blocks.
+        :return: The ciphertext blocks.
+        """
+        return self._crypt(blocks, decrypt=False)
+
+    def decrypt_blocks(self, blocks: Sequence[bytes]) -> List[bytes]:
+        """
+        Decrypt 8-byte blocks independently, as in ECB mode.
+
+        :param blocks: The ciphertext blocks.
+        :return: The plaintext blocks.
+        """
+        return self._crypt(blocks, decrypt=True)
+
+
+def encrypt_with_keys(block: bytes, keys: Sequence[bytes]) -> List[bytes]:
+    """
+    Encrypt one block under many keys at once, as needed for a key search.
+
+    :param block: The 8-byte plaintext block.
+    :param keys: The 8-byte keys.
+    :return: The ciphertext block for every key.
+    """
+    if len(block) != 8:
+        raise ValueError("DES block must be 8 bytes long")
+
+    value = int.from_bytes(block, "big")
+    output: List[bytes] = []
+    for start in range(0, len(keys), BATCH_SIZE):
+        batch = keys[start : start + BATCH_SIZE]
+        count = len(batch)
+        ones = (1 << count) - 1
+
+        # Here the keys are sliced and the block is the same in every position
+        lanes = [ones if (value >> (63 - i)) & 1 else 0 for i in range(64)]
+        lanes = crypt_lanes(lanes, to_lanes(b"".join(batch), count), ones, False)
+
+        data = from_lanes(lanes, count)
+        output += [data[i : i + 8] for i in range(0, len(data), 8)]
+    return output
+
+
+def main() -> None:
+    key = bytes.fromhex("AABB09182736CCDD")
+    blocks = [bytes.fromhex("123456ABCD132536"), b"bitslice", b"DES lane"]
+
+    engine = BitslicedDES(key)
+    cipher_blocks = engine.encrypt_blocks(blocks)
+    plain_blocks = engine.decrypt_blocks(cipher_blocks)
+
+    for cipher_text, plain_text in zip(cipher_blocks, plain_blocks):
+        print(
+            f"Cipher Text : {cipher_text.hex().upper()} -> {plain_text.hex().upper()}"
+        )
+
+
+if __name__ == "__main__":
+    main()
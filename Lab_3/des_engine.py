@@ -0,0 +1,312 @@
+#!/usr/bin/python3
+from functools import lru_cache
+from typing import Final, List, Sequence, Tuple, Union
+
+from constant import (
+    exp_d,
+    final_perm,
+    initial_perm,
+    key_comp,
+    keyp,
+    per,
+    sbox,
+    shift_table,
+)
+from permutation import (
+    ByteTables,
+    CompiledPermutation,
+    compile_permutation,
+    permute_bits,
+)
+
+# Number of derived key schedules kept for reuse
+KEY_CACHE_SIZE: Final[int] = 512
+
+
+def sp_tables() -> ByteTables:
+    """
+    Precompute the S-boxes merged with the straight permutation.
+
+    Entry v of table j is P applied to the 4-bit output of S-box j for the
+    6-bit input v, placed at the position of S-box j in the 32-bit word.
+
+    :return: Eight 64-entry lookup tables.
+    """
+    tables: List[Tuple[int, ...]] = []
+    for j in range(8):
+        entries: List[int] = []
+        for value in range(64):
+            # The outer bits select the row, the inner four bits the column
+            row = ((value >> 4) & 2) | (value & 1)
+            col = (value >> 1) & 15
+            output = sbox[j][row][col] << (28 - 4 * j)
+            entries.append(permute_bits(output, per, 32))
+        tables.append(tuple(entries))
+    return tuple(tables)
+
+
+# The permutations, compiled into one lookup table per input byte
+IP: Final[CompiledPermutation] = compile_permutation(initial_perm, 64)
+FP: Final[CompiledPermutation] = compile_permutation(final_perm, 64)
+E: Final[CompiledPermutation] = compile_permutation(exp_d, 32)
+PC1: Final[CompiledPermutation] = compile_permutation(keyp, 64)
+PC2: Final[CompiledPermutation] = compile_permutation(key_comp, 56)
+
+IP_TABLES: Final[ByteTables] = IP.tables
+FP_TABLES: Final[ByteTables] = FP.tables
+E_TABLES: Final[ByteTables] = E.tables
+SP_TABLES: Final[ByteTables] = sp_tables()
+
+
+def round_keys(key: int) -> List[int]:
+    """
+    Generate the 16 round keys of DES.
+
+    :param key: The 64-bit key, including the parity bits.
+    :return: The 48-bit round keys in encryption order.
+    """
+    # Getting 56 bit key from 64 bit using the parity bits
+    key = PC1.compiled_permute(key)
+    left, right = key >> 28, key & 0xFFFFFFF
+
+    keys: List[int] = []
+    for shift in shift_table:
+        # Shifting both 28-bit halves by nth shifts
+        left = ((left << shift) | (left >> (28 - shift))) & 0xFFFFFFF
+        right = ((right << shift) | (right >> (28 - shift))) & 0xFFFFFFF
+
+        # Compression of key from 56 to 48 bits
+        keys.append(PC2.compiled_permute((left << 28) | right))
+    return keys
+
+
+def initial_permutation(block: int) -> int:
+    """
+    Apply the initial permutation to a 64-bit block.
+
+    :param block: The input block.
+    :return: The permuted block.
+    """
+    ip0, ip1, ip2, ip3, ip4, ip5, ip6, ip7 = IP_TABLES
+    return (
+        ip0[block >> 56]
+        | ip1[(block >> 48) & 0xFF]
+        | ip2[(block >> 40) & 0xFF]
+        | ip3[(block >> 32) & 0xFF]
+        | ip4[(block >> 24) & 0xFF]
+        | ip5[(block >> 16) & 0xFF]
+        | ip6[(block >> 8) & 0xFF]
+        | ip7[block & 0xFF]
+    )
+
+
+def final_permutation(block: int) -> int:
+    """
+    Apply the final permutation to a 64-bit block.
+
+    :param block: The input block.
+    :return: The permuted block.
+    """
+    fp0, fp1, fp2, fp3, fp4, fp5, fp6, fp7 = FP_TABLES
+    return (
+        fp0[block >> 56]
+        | fp1[(block >> 48) & 0xFF]
+        | fp2[(block >> 40) & 0xFF]
+        | fp3[(block >> 32) & 0xFF]
+        | fp4[(block >> 24) & 0xFF]
+        | fp5[(block >> 16) & 0xFF]
+        | fp6[(block >> 8) & 0xFF]
+        | fp7[block & 0xFF]
+    )
+
+
+def feistel_rounds(block: int, subkeys: Sequence[int]) -> int:
+    """
+    Run the DES rounds between the initial and the final permutation.
+
+    :param block: The block after the initial permutation.
+    :param subkeys: The round keys, reversed for decryption.
+    :return: The block before the final permutation, with the halves swapped back.
+    """
+    e0, e1, e2, e3 = E_TABLES
+    sp0, sp1, sp2, sp3, sp4, sp5, sp6, sp7 = SP_TABLES
+
+    left, right = block >> 32, block & 0xFFFFFFFF
+    for subkey in subkeys:
+        # Expansion D-box and XOR with the round key
+        x = (
+            e0[right >> 24]
+            | e1[(right >> 16) & 0xFF]
+            | e2[(right >> 8) & 0xFF]
+            | e3[right & 0xFF]
+        ) ^ subkey
+
+        # S-boxes and the straight D-box in one lookup per S-box
+        left ^= (
+            sp0[x >> 42]
+            | sp1[(x >> 36) & 0x3F]
+            | sp2[(x >> 30) & 0x3F]
+            | sp3[(x >> 24) & 0x3F]
+            | sp4[(x >> 18) & 0x3F]
+            | sp5[(x >> 12) & 0x3F]
+            | sp6[(x >> 6) & 0x3F]
+            | sp7[x & 0x3F]
+        )
+        left, right = right, left
+
+    # Undo the last swap
+    return (right << 32) | left
+
+
+def crypt_block(block: int, subkeys: Sequence[int]) -> int:
+    """
+    Run DES over a 64-bit block.
+
+    :param block: The input block.
+    :param subkeys: The 16 round keys, reversed for decryption.
+    :return: The output block.
+    """
+    return final_permutation(feistel_rounds(initial_permutation(block), subkeys))
+
+
+class DESKey:
+    """
+    A DES key with its 16 round keys derived once, in both orderings.
+    """
+
+    __slots__ = ("key", "encryption_keys", "decryption_keys")
+
+    def __init__(self, key: bytes) -> None:
+        """
+        Derive the round keys.
+
+        :param key: The 8-byte DES key.
+        """
+        if len(key) != 8:
+            raise ValueError("DES key must be 8 bytes long")
+
+        self.key: Final[bytes] = bytes(key)
+        self.encryption_keys: Final[Tuple[int, ...]] = tuple(
+            round_keys(int.from_bytes(key, "big"))
+        )
+        self.decryption_keys: Final[Tuple[int, ...]] = self.encryption_keys[::-1]
+
+    @staticmethod
+    def from_bytes(key: bytes) -> "DESKey":
+        """
+        Get the key schedule, reusing one derived recently for the same key.
+
+        :param key: The 8-byte DES key.
+        :return: The key schedule.
+        """
+        return _cached_key(bytes(key))
+
+    def round_keys_bin(self, decrypt: bool = False) -> List[str]:
+        """
+        Get the round keys as binary strings, as used by des.encrypt.
+
+        :param decrypt: True for the decryption ordering.
+        :return: The 48-character binary round keys.
+        """
+        keys = self.decryption_keys if decrypt else self.encryption_keys
+        return [format(key, "048b") for key in keys]
+
+    def round_keys_hex(self, decrypt: bool = False) -> List[str]:
+        """
+        Get the round keys as hexadecimal strings, as used by des.encrypt.
+
+        :param decrypt: True for the decryption ordering.
+        :return: The 12-digit hexadecimal round keys.
+        """
+        keys = self.decryption_keys if decrypt else self.encryption_keys
+        return [format(key, "012X") for key in keys]
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def _cached_key(key: bytes) -> DESKey:
+    """
+    Derive a key schedule, keeping the most recently used ones.
+
+    :param key: The 8-byte DES key.
+    :return: The key schedule.
+    """
+    return DESKey(key)
+
+
+class DESEngine:
+    """
+    A DES implementation working on native integers with precomputed lookup tables.
+    """
+
+    block_size: Final[int] = 8
+
+    def __init__(self, key: Union[bytes, DESKey]) -> None:
+        """
+        Initialize the engine with a key schedule.
+
+        :param key: The 8-byte DES key or its derived schedule.
+        """
+        if not isinstance(key, DESKey):
+            key = DESKey.from_bytes(key)
+
+        self.key: Final[DESKey] = key
+        self.encryption_keys: Final[Tuple[int, ...]] = key.encryption_keys
+        self.decryption_keys: Final[Tuple[int, ...]] = key.decryption_keys
+
+    def encrypt_int(self, block: int) -> int:
+        """
+        Encrypt a 64-bit block given as an integer.
+
+        :param block: The plaintext block.
+        :return: The ciphertext block.
+        """
+        return crypt_block(block, self.encryption_keys)
+
+    def decrypt_int(self, block: int) -> int:
+        """
+        Decrypt a 64-bit block given as an integer.
+
+        :param block: The ciphertext block.
+        :return: The plaintext block.
+        """
+        return crypt_block(block, self.decryption_keys)
+
+    def encrypt_block(self, block: bytes) -> bytes:
+        """
+        Encrypt an 8-byte block.
+
+        :param block: The plaintext block.
+        :return: The ciphertext block.
+        """
+        if len(block) != 8:
+            raise ValueError("DES block must be 8 bytes long")
+        return self.encrypt_int(int.from_bytes(block, "big")).to_bytes(8, "big")
+
+    def decrypt_block(self, block: bytes) -> bytes:
+        """
+        Decrypt an 8-byte block.
+
+        :param block: The ciphertext block.
+        :return: The plaintext block.
+        """
+        if len(block) != 8:
+            raise ValueError("DES block must be 8 bytes long")
+        return self.decrypt_int(int.from_bytes(block, "big")).to_bytes(8, "big")
+
+
+def main() -> None:
+    pt = bytes.fromhex("123456ABCD132536")
+    key = bytes.fromhex("AABB09182736CCDD")
+
+    engine = DESEngine(key)
+    cipher_text = engine.encrypt_block(pt)
+    plain_text = engine.decrypt_block(cipher_text)
+
+    return print(
+        f"Cipher Text : {cipher_text.hex().upper()}\n"
+        f"Plain Text : {plain_text.hex().upper()}"
+    )
+
+
+if __name__ == "__main__":
+    main()
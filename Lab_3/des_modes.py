@@ -0,0 +1,421 @@
+#!/usr/bin/python3
+import struct
+from abc import ABC, abstractmethod
+from typing import Callable, Final, List, Union
+
+from des_engine import DESEngine, DESKey
+
+BLOCK_SIZE: Final[int] = 8
+MASK_64: Final[int] = (1 << 64) - 1
+
+
+def pkcs7_pad(data: bytes, block_size: int = BLOCK_SIZE) -> bytes:
+    """
+    Pad data to a whole number of blocks as described in PKCS#7.
+
+    :param data: The data to be padded.
+    :param block_size: The block size in bytes.
+    :return: The padded data.
+    """
+    padding = block_size - len(data) % block_size
+    return bytes(data) + bytes((padding,)) * padding
+
+
+def pkcs7_unpad(data: bytes, block_size: int = BLOCK_SIZE) -> bytes:
+    """
+    Remove PKCS#7 padding.
+
+    :param data: The padded data.
+    :param block_size: The block size in bytes.
+    :return: The data without padding.
+    """
+    if not data or len(data) % block_size:
+        raise ValueError("Invalid padding")
+
+    padding = data[-1]
+    if not 1 <= padding <= block_size or data[-padding:] != bytes((padding,)) * padding:
+        raise ValueError("Invalid padding")
+    return bytes(data[:-padding])
+
+
+def unpack_blocks(data: bytes) -> List[int]:
+    """
+    Split data into 64-bit big-endian integers in one call.
+
+    :param data: The data, a whole number of blocks.
+    :return: The blocks as integers.
+    """
+    return list(struct.unpack(f">{len(data) // BLOCK_SIZE}Q", data))
+
+
+def pack_blocks(blocks: List[int]) -> bytes:
+    """
+    Join 64-bit integers into big-endian bytes in one call.
+
+    :param blocks: The blocks as integers.
+    :return: The data.
+    """
+    return struct.pack(f">{len(blocks)}Q", *blocks)
+
+
+def xor_bytes(data: bytes, keystream: bytes) -> bytes:
+    """
+    XOR two byte strings of equal length as two big integers.
+
+    :param data: The input data.
+    :param keystream: The keystream.
+    :return: The XOR of the inputs.
+    """
+    return (int.from_bytes(data, "big") ^ int.from_bytes(keystream, "big")).to_bytes(
+        len(data), "big"
+    )
+
+
+class DESMode(ABC):
+    """
+    A base class for incremental encryption and decryption in a mode of operation.
+
+    Data can be passed to update in pieces of any size, the output is the same
+    as for the concatenated input. finalize flushes the remaining data.
+    """
+
+    def __init__(
+        self, key: Union[bytes, DESKey, DESEngine], decrypt: bool = False
+    ) -> None:
+        """
+        Initialize the mode with a key.
+
+        :param key: The DES key, its schedule, or a block cipher object with
+            encrypt_int and decrypt_int methods.
+        :param decrypt: True for decryption, False for encryption.
+        """
+        self.cipher = key if hasattr(key, "encrypt_int") else DESEngine(key)
+        self.decrypt: Final[bool] = decrypt
+        self._finalized: bool = False
+
+    def _check(self) -> None:
+        """
+        Make sure the context can still be used.
+        """
+        if self._finalized:
+            raise ValueError("The context is already finalized")
+
+    @abstractmethod
+    def update(self, data: bytes) -> bytes:
+        """
+        Process the next piece of data.
+
+        :param data: The input data.
+        :return: The output available so far.
+        """
+
+    @abstractmethod
+    def finalize(self) -> bytes:
+        """
+        Finish processing.
+
+        :return: The remaining output.
+        """
+
+    def process(self, data: bytes) -> bytes:
+        """
+        Process a whole message in one call.
+
+        :param data: The input data.
+        :return: The complete output.
+        """
+        return self.update(data) + self.finalize()
+
+
+class _BlockMode(DESMode):
+    """
+    A mode that processes whole blocks and may pad the message.
+    """
+
+    def __init__(
+        self,
+        key: Union[bytes, DESKey, DESEngine],
+        decrypt: bool = False,
+        padding: bool = True,
+    ) -> None:
+        """
+        Initialize the mode.
+
+        :param key: The DES key, its schedule, or a block cipher object.
+        :param decrypt: True for decryption, False for encryption.
+        :param padding: Whether the message is padded as described in PKCS#7.
+        """
+        super().__init__(key=key, decrypt=decrypt)
+        self.padding: Final[bool] = padding
+        self._buffer: bytearray = bytearray()
+
+    @abstractmethod
+    def _process_blocks(self, blocks: List[int]) -> List[int]:
+        """
+        Encrypt or decrypt whole blocks.
+
+        :param blocks: The input blocks as integers.
+        :return: The output blocks as integers.
+        """
+
+    def update(self, data: bytes) -> bytes:
+        """
+        Process the whole blocks buffered so far, keeping the rest for later.
+
+        :param data: The input data.
+        :return: The output of the whole blocks.
+        """
+        self._check()
+        self._buffer += data
+
+        # With padding, the last block of the ciphertext is held back until
+        # finalize, since only there it is known to be the last one
+        if self.decrypt and self.padding:
+            length = (len(self._buffer) - 1) // BLOCK_SIZE * BLOCK_SIZE
+        else:
+            length = len(self._buffer) // BLOCK_SIZE * BLOCK_SIZE
+        if length <= 0:
+            return b""
+
+        blocks = unpack_blocks(bytes(self._buffer[:length]))
+        del self._buffer[:length]
+        return pack_blocks(self._process_blocks(blocks))
+
+    def finalize(self) -> bytes:
+        """
+        Process the buffered data, adding or removing the padding.
+
+        :return: The remaining output.
+        """
+        self._check()
+        self._finalized = True
+        data, self._buffer = bytes(self._buffer), bytearray()
+
+        if not self.padding:
+            if data:
+                raise ValueError("The data is not a whole number of blocks")
+            return b""
+
+        if not self.decrypt:
+            return pack_blocks(self._process_blocks(unpack_blocks(pkcs7_pad(data))))
+
+        if len(data) != BLOCK_SIZE:
+            raise ValueError("The data is not a whole number of blocks")
+        return pkcs7_unpad(pack_blocks(self._process_blocks(unpack_blocks(data))))
+
+
+class ECB(_BlockMode):
+    """
+    Electronic codebook mode: every block is encrypted independently.
+    """
+
+    def _process_blocks(self, blocks: List[int]) -> List[int]:
+        """
+        Encrypt or decrypt every block on its own.
+
+        :param blocks: The input blocks as integers.
+        :return: The output blocks as integers.
+        """
+        crypt = self.cipher.decrypt_int if self.decrypt else self.cipher.encrypt_int
+        return list(map(crypt, blocks))
+
+
+class CBC(_BlockMode):
+    """
+    Cipher block chaining mode: every plaintext block is XORed with the
+    previous ciphertext block.
+    """
+
+    def __init__(
+        self,
+        key: Union[bytes, DESKey, DESEngine],
+        iv: bytes,
+        decrypt: bool = False,
+        padding: bool = True,
+    ) -> None:
+        """
+        Initialize the mode.
+
+        :param key: The DES key, its schedule, or a block cipher object.
+        :param iv: The 8-byte initialization vector.
+        :param decrypt: True for decryption, False for encryption.
+        :param padding: Whether the message is padded as described in PKCS#7.
+        """
+        if len(iv) != BLOCK_SIZE:
+            raise ValueError("The IV must be 8 bytes long")
+
+        super().__init__(key=key, decrypt=decrypt, padding=padding)
+        self._previous: int = int.from_bytes(iv, "big")
+
+    def _process_blocks(self, blocks: List[int]) -> List[int]:
+        """
+        Encrypt or decrypt blocks, chaining them from the previous call.
+
+        :param blocks: The input blocks as integers.
+        :return: The output blocks as integers.
+        """
+        if self.decrypt:
+            # Decryption does not depend on its own output, so it is one pass
+            chain = [self._previous] + blocks[:-1]
+            self._previous = blocks[-1]
+            return [
+                plain ^ previous
+                for plain, previous in zip(map(self.cipher.decrypt_int, blocks), chain)
+            ]
+
+        encrypt: Callable[[int], int] = self.cipher.encrypt_int
+        previous = self._previous
+        output: List[int] = []
+        for block in blocks:
+            previous = encrypt(block ^ previous)
+            output.append(previous)
+        self._previous = previous
+        return output
+
+
+class _StreamMode(DESMode):
+    """
+    A mode that XORs the data with a keystream and needs no padding.
+    """
+
+    def __init__(self, key: Union[bytes, DESKey, DESEngine]) -> None:
+        """
+        Initialize the mode.
+
+        :param key: The DES key, its schedule, or a block cipher object.
+        """
+        # Encryption and decryption are the same operation
+        super().__init__(key=key)
+        self._keystream: bytes = b""
+
+    @abstractmethod
+    def _next_blocks(self, count: int) -> List[int]:
+        """
+        Generate the next keystream blocks.
+
+        :param count: The number of blocks.
+        :return: The keystream blocks as integers.
+        """
+
+    def update(self, data: bytes) -> bytes:
+        """
+        XOR the next piece of data with the keystream.
+
+        :param data: The input data.
+        :return: The output data, as long as the input.
+        """
+        self._check()
+        if not data:
+            return b""
+
+        # Use the keystream left over from the previous call first
+        missing = len(data) - len(self._keystream)
+        keystream = self._keystream
+        if missing > 0:
+            keystream += pack_blocks(self._next_blocks(-(-missing // BLOCK_SIZE)))
+        self._keystream = keystream[len(data) :]
+
+        return xor_bytes(data, keystream[: len(data)])
+
+    def finalize(self) -> bytes:
+        """
+        Finish processing, the output being complete already.
+
+        :return: An empty string.
+        """
+        self._check()
+        self._finalized = True
+        return b""
+
+
+class CTR(_StreamMode):
+    """
+    Counter mode: the keystream is the encryption of successive counter blocks.
+    """
+
+    def __init__(self, key: Union[bytes, DESKey, DESEngine], nonce: bytes) -> None:
+        """
+        Initialize the mode.
+
+        :param key: The DES key, its schedule, or a block cipher object.
+        :param nonce: The 8-byte initial counter block, incremented modulo 2^64.
+        """
+        if len(nonce) != BLOCK_SIZE:
+            raise ValueError("The nonce must be 8 bytes long")
+
+        super().__init__(key=key)
+        self._counter: int = int.from_bytes(nonce, "big")
+
+    def _next_blocks(self, count: int) -> List[int]:
+        """
+        Encrypt the next counter blocks.
+
+        :param count: The number of blocks.
+        :return: The keystream blocks as integers.
+        """
+        counter = self._counter
+        self._counter = (counter + count) & MASK_64
+        return [self.cipher.encrypt_int((counter + i) & MASK_64) for i in range(count)]
+
+
+class OFB(_StreamMode):
+    """
+    Output feedback mode: the keystream is the repeated encryption of the IV.
+    """
+
+    def __init__(self, key: Union[bytes, DESKey, DESEngine], iv: bytes) -> None:
+        """
+        Initialize the mode.
+
+        :param key: The DES key, its schedule, or a block cipher object.
+        :param iv: The 8-byte initialization vector.
+        """
+        if len(iv) != BLOCK_SIZE:
+            raise ValueError("The IV must be 8 bytes long")
+
+        super().__init__(key=key)
+        self._feedback: int = int.from_bytes(iv, "big")
+
+    def _next_blocks(self, count: int) -> List[int]:
+        """
+        Encrypt the feedback block repeatedly.
+
+        :param count: The number of blocks.
+        :return: The keystream blocks as integers.
+        """
+        encrypt: Callable[[int], int] = self.cipher.encrypt_int
+        feedback = self._feedback
+        output: List[int] = []
+        for _ in range(count):
+            feedback = encrypt(feedback)
+            output.append(feedback)
+        self._feedback = feedback
+        return output
+
+
+def main() -> None:
+    key = bytes.fromhex("AABB09182736CCDD")
+    iv = bytes.fromhex("0123456789ABCDEF")
+    message = b"Programmable DES modes of operation"
+
+    ciphertexts: List[bytes] = [
+        ECB(key).process(message),
+        CBC(key, iv).process(message),
+        CTR(key, iv).process(message),
+        OFB(key, iv).process(message),
+    ]
+    plaintexts: List[bytes] = [
+        ECB(key, decrypt=True).process(ciphertexts[0]),
+        CBC(key, iv, decrypt=True).process(ciphertexts[1]),
+        CTR(key, iv).process(ciphertexts[2]),
+        OFB(key, iv).process(ciphertexts[3]),
+    ]
+
+    for name, cipher_text, plain_text in zip(
+        ("ECB", "CBC", "CTR", "OFB"), ciphertexts, plaintexts
+    ):
+        print(f"{name} : {cipher_text.hex().upper()} -> {plain_text.decode()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,484 @@
+#!/usr/bin/python3
+import os
+import struct
+import tempfile
+import threading
+from multiprocessing.pool import Pool
+from typing import (
+    BinaryIO,
+    Callable,
+    Dict,
+    Final,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from des_bitslice import Lanes, crypt_lanes, from_lanes, to_lanes
+from des_engine import DESEngine
+
+# Number of keys in one work unit, sliced into the lanes together
+CHUNK_SIZE: Final[int] = 1 << 14
+
+# Number of first-stage results the meet-in-the-middle attack keeps in memory
+MEMORY_LIMIT: Final[int] = 1 << 22
+
+# A partition record: the intermediate value and the key index
+RECORD: Final[struct.Struct] = struct.Struct(">QQ")
+
+# Number of partition records read from disk at once
+READ_RECORDS: Final[int] = 1 << 16
+
+# Key bits ignored by DES
+PARITY_BITS: Final[Tuple[int, ...]] = tuple(range(8, 65, 8))
+
+Progress = Callable[[int, int], None]
+
+
+class KeySpace:
+    """
+    A reduced DES keyspace: the keys that differ from a base key only in chosen bits.
+    """
+
+    def __init__(self, base_key: bytes, unknown_bits: Sequence[int]) -> None:
+        """
+        Initialize the keyspace.
+
+        :param base_key: The 8-byte key holding the known bits.
+        :param unknown_bits: The 1-based positions of the unknown key bits, as
+            numbered in the DES tables. Parity bits cannot be unknown.
+        """
+        if len(base_key) != 8:
+            raise ValueError("DES key must be 8 bytes long")
+        if len(set(unknown_bits)) != len(unknown_bits):
+            raise ValueError("The unknown bits must not repeat")
+        if any(not 1 <= bit <= 64 or bit in PARITY_BITS for bit in unknown_bits):
+            raise ValueError("The unknown bits must be non-parity bits from 1 to 64")
+
+        masks = [1 << (64 - bit) for bit in unknown_bits]
+        self.unknown_bits: Final[Tuple[int, ...]] = tuple(unknown_bits)
+        self.base: Final[int] = int.from_bytes(base_key, "big") & ~sum(masks)
+        self.size: Final[int] = 1 << len(masks)
+
+        # Every byte of a key index spread over its key bits in one lookup
+        self._deposit: Final[Tuple[Tuple[int, ...], ...]] = tuple(
+            tuple(
+                sum(mask for j, mask in enumerate(masks[i : i + 8]) if value >> j & 1)
+                for value in range(256)
+            )
+            for i in range(0, len(masks), 8)
+        )
+
+    def key(self, index: int) -> int:
+        """
+        Get a key of the keyspace.
+
+        :param index: The index of the key, from 0 to size - 1.
+        :return: The 64-bit key.
+        """
+        key = self.base
+        for table in self._deposit:
+            key |= table[index & 0xFF]
+            index >>= 8
+        return key
+
+    def key_bytes(self, index: int) -> bytes:
+        """
+        Get a key of the keyspace as bytes.
+
+        :param index: The index of the key, from 0 to size - 1.
+        :return: The 8-byte key.
+        """
+        return self.key(index).to_bytes(8, "big")
+
+    def pack(self, start: int, stop: int) -> bytes:
+        """
+        Get a range of keys joined together.
+
+        :param start: The index of the first key.
+        :param stop: The index after the last key.
+        :return: The 8-byte keys joined together.
+        """
+        return struct.pack(f">{stop - start}Q", *map(self.key, range(start, stop)))
+
+
+def _crypt_range(
+    space: KeySpace, block: int, decrypt: bool, start: int, stop: int
+) -> Lanes:
+    """
+    Encrypt or decrypt one block under a range of keys, bitsliced over the keys.
+
+    :param space: The keyspace.
+    :param block: The 64-bit input block.
+    :param decrypt: True for decryption, False for encryption.
+    :param start: The index of the first key.
+    :param stop: The index after the last key.
+    :return: The 64 lanes of the output, the first key being the most significant bit.
+    """
+    count = stop - start
+    ones = (1 << count) - 1
+    lanes = [ones if (block >> (63 - i)) & 1 else 0 for i in range(64)]
+    return crypt_lanes(lanes, to_lanes(space.pack(start, stop), count), ones, decrypt)
+
+
+def _search_chunk(task: Tuple[KeySpace, int, int, int, int]) -> Tuple[int, List[int]]:
+    """
+    Try a range of keys against a known plaintext and ciphertext, in a worker process.
+
+    :param task: The keyspace, the plaintext, the ciphertext and the key range.
+    :return: The number of keys tried and the indices of the matching keys.
+    """
+    space, plaintext, ciphertext, start, stop = task
+    count = stop - start
+    ones = (1 << count) - 1
+
+    # A key matches when its bit agrees with the ciphertext in every lane
+    mismatch = 0
+    for i, lane in enumerate(_crypt_range(space, plaintext, False, start, stop)):
+        mismatch |= lane ^ ones if (ciphertext >> (63 - i)) & 1 else lane
+    matches = ones ^ mismatch
+
+    found: List[int] = []
+    while matches:
+        bit = matches.bit_length() - 1
+        found.append(start + count - 1 - bit)
+        matches ^= 1 << bit
+    return count, found
+
+
+def _crypt_chunk(task: Tuple[KeySpace, int, bool, int, int]) -> Tuple[int, bytes]:
+    """
+    Encrypt or decrypt one block under a range of keys, in a worker process.
+
+    :param task: The keyspace, the block, the direction and the key range.
+    :return: The index of the first key and the output blocks joined together.
+    """
+    space, block, decrypt, start, stop = task
+    return start, from_lanes(
+        _crypt_range(space, block, decrypt, start, stop), stop - start
+    )
+
+
+def _chunks(size: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """
+    Split a keyspace into work units.
+
+    :param size: The number of keys.
+    :param chunk_size: The number of keys in a work unit.
+    :return: The key ranges.
+    """
+    return [
+        (start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)
+    ]
+
+
+class KeySearch:
+    """
+    A brute-force search of a reduced DES keyspace, split across worker processes.
+    """
+
+    def __init__(
+        self,
+        plaintext: bytes,
+        ciphertext: bytes,
+        space: KeySpace,
+        processes: Optional[int] = None,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> None:
+        """
+        Initialize the search.
+
+        :param plaintext: The known 8-byte plaintext block.
+        :param ciphertext: Its 8-byte ciphertext block.
+        :param space: The keys to try.
+        :param processes: The number of worker processes, one per core by default.
+        :param chunk_size: The number of keys in a work unit.
+        """
+        if len(plaintext) != 8 or len(ciphertext) != 8:
+            raise ValueError("DES block must be 8 bytes long")
+
+        self.plaintext: Final[int] = int.from_bytes(plaintext, "big")
+        self.ciphertext: Final[int] = int.from_bytes(ciphertext, "big")
+        self.space: Final[KeySpace] = space
+        self.processes: Final[Optional[int]] = processes
+        self.chunk_size: Final[int] = chunk_size
+        self._cancelled: Final[threading.Event] = threading.Event()
+
+    def cancel(self) -> None:
+        """
+        Stop the search after the work units already finished, from any thread
+        or from the progress callback.
+        """
+        self._cancelled.set()
+
+    def run(
+        self, progress: Optional[Progress] = None, stop_on_first: bool = True
+    ) -> List[bytes]:
+        """
+        Search the keyspace.
+
+        :param progress: Called with the number of keys tried and the size of
+            the keyspace after every work unit.
+        :param stop_on_first: Whether to stop at the first matching key.
+        :return: The matching keys found before the search ended.
+        """
+        self._cancelled.clear()
+        tasks = [
+            (self.space, self.plaintext, self.ciphertext, start, stop)
+            for start, stop in _chunks(self.space.size, self.chunk_size)
+        ]
+
+        found: List[bytes] = []
+        tried = 0
+        with Pool(self.processes) as pool:
+            for count, indices in pool.imap_unordered(_search_chunk, tasks):
+                tried += count
+                found += map(self.space.key_bytes, indices)
+                if progress is not None:
+                    progress(tried, self.space.size)
+                if self._cancelled.is_set() or (found and stop_on_first):
+                    # Leaving the block terminates the remaining work units
+                    break
+        return found
+
+
+class MeetInTheMiddle:
+    """
+    A meet-in-the-middle attack on double DES, C = E(K2, E(K1, P)).
+
+    The encryptions of P under every K1 are matched with the decryptions of C
+    under every K2. The table of the first stage is kept in memory when it fits
+    in the limit, otherwise both stages are partitioned on disk by the
+    intermediate value and joined one partition at a time.
+    """
+
+    def __init__(
+        self,
+        plaintext: bytes,
+        ciphertext: bytes,
+        first: KeySpace,
+        second: KeySpace,
+        processes: Optional[int] = None,
+        chunk_size: int = CHUNK_SIZE,
+        memory_limit: int = MEMORY_LIMIT,
+    ) -> None:
+        """
+        Initialize the attack.
+
+        :param plaintext: The known 8-byte plaintext block.
+        :param ciphertext: Its 8-byte double DES ciphertext block.
+        :param first: The candidates for the first key.
+        :param second: The candidates for the second key.
+        :param processes: The number of worker processes, one per core by default.
+        :param chunk_size: The number of keys in a work unit.
+        :param memory_limit: The number of table entries kept in memory at once.
+        """
+        if len(plaintext) != 8 or len(ciphertext) != 8:
+            raise ValueError("DES block must be 8 bytes long")
+
+        self.plaintext: Final[int] = int.from_bytes(plaintext, "big")
+        self.ciphertext: Final[int] = int.from_bytes(ciphertext, "big")
+        self.first: Final[KeySpace] = first
+        self.second: Final[KeySpace] = second
+        self.processes: Final[Optional[int]] = processes
+        self.chunk_size: Final[int] = chunk_size
+        self.memory_limit: Final[int] = memory_limit
+
+    def _stage(
+        self, pool: Pool, space: KeySpace, block: int, decrypt: bool
+    ) -> Iterator[Tuple[int, Tuple[int, ...]]]:
+        """
+        Compute one side of the attack in the worker processes.
+
+        :param pool: The worker pool.
+        :param space: The keys of this side.
+        :param block: The known block of this side.
+        :param decrypt: True for the second side, which decrypts the ciphertext.
+        :return: An iterator over the index of the first key and the
+            intermediate values of every work unit.
+        """
+        tasks = [
+            (space, block, decrypt, start, stop)
+            for start, stop in _chunks(space.size, self.chunk_size)
+        ]
+        for start, data in pool.imap_unordered(_crypt_chunk, tasks):
+            yield start, struct.unpack(f">{len(data) // 8}Q", data)
+
+    def _join_in_memory(self, pool: Pool) -> Iterator[Tuple[int, int]]:
+        """
+        Match both sides with the first one held in a hash table.
+
+        :param pool: The worker pool.
+        :return: An iterator over the index pairs of the matching keys.
+        """
+        table: Dict[int, List[int]] = {}
+        for start, values in self._stage(pool, self.first, self.plaintext, False):
+            for index, value in enumerate(values, start):
+                table.setdefault(value, []).append(index)
+
+        for start, values in self._stage(pool, self.second, self.ciphertext, True):
+            for index, value in enumerate(values, start):
+                for first in table.get(value, ()):
+                    yield first, index
+
+    def _partition(
+        self,
+        pool: Pool,
+        space: KeySpace,
+        block: int,
+        decrypt: bool,
+        files: List[BinaryIO],
+    ) -> None:
+        """
+        Write one side to the partition files, by the intermediate value.
+
+        :param pool: The worker pool.
+        :param space: The keys of this side.
+        :param block: The known block of this side.
+        :param decrypt: True for the second side.
+        :param files: The open partition files of this side.
+        """
+        count = len(files)
+        for start, values in self._stage(pool, space, block, decrypt):
+            buffers: List[List[bytes]] = [[] for _ in range(count)]
+            for index, value in enumerate(values, start):
+                buffers[value % count].append(RECORD.pack(value, index))
+            for file, buffer in zip(files, buffers):
+                file.write(b"".join(buffer))
+
+    def _read_partition(self, path: str) -> Iterator[Tuple[int, int]]:
+        """
+        Read a partition file in fixed-size chunks of records.
+
+        :param path: The path of the partition file.
+        :return: An iterator over the intermediate values and the key indices.
+        """
+        # The same buffer is reused for every chunk, within the memory limit
+        buffer = bytearray(RECORD.size * min(READ_RECORDS, self.memory_limit))
+        view = memoryview(buffer)
+        with open(path, "rb") as file:
+            while True:
+                length = file.readinto(buffer)
+                if not length:
+                    return
+                yield from RECORD.iter_unpack(view[:length])
+
+    def _join_on_disk(self, pool: Pool, directory: str) -> Iterator[Tuple[int, int]]:
+        """
+        Match both sides one partition at a time.
+
+        :param pool: The worker pool.
+        :param directory: The directory holding the partition files.
+        :return: An iterator over the index pairs of the matching keys.
+        """
+        # Sized by the larger side, so that a partition of either side fits in
+        # the limit, and twice the minimum, so that uneven partitions still do
+        size = max(self.first.size, self.second.size)
+        count = 2 * -(-size // self.memory_limit)
+        paths = [
+            [os.path.join(directory, f"{side}_{i}.bin") for i in range(count)]
+            for side in ("first", "second")
+        ]
+
+        for side, (space, block, decrypt) in enumerate(
+            (
+                (self.first, self.plaintext, False),
+                (self.second, self.ciphertext, True),
+            )
+        ):
+            files = [open(path, "wb") for path in paths[side]]
+            try:
+                self._partition(pool, space, block, decrypt, files)
+            finally:
+                for file in files:
+                    file.close()
+
+        for first_path, second_path in zip(*paths):
+            table: Dict[int, List[int]] = {}
+            for value, index in self._read_partition(first_path):
+                table.setdefault(value, []).append(index)
+            for value, index in self._read_partition(second_path):
+                for first in table.get(value, ()):
+                    yield first, index
+
+    def _accept(
+        self,
+        matches: Iterator[Tuple[int, int]],
+        check: Optional[Tuple[bytes, bytes]],
+    ) -> List[Tuple[int, int]]:
+        """
+        Keep the matches that also hold for the check pair, as they are found.
+
+        :param matches: The index pairs of the matching keys.
+        :param check: Another plaintext and ciphertext block pair, or None.
+        :return: The index pairs kept, sorted.
+        """
+        if check is None:
+            return sorted(matches)
+
+        plaintext, ciphertext = check
+        return sorted(
+            (first, second)
+            for first, second in matches
+            if DESEngine(self.second.key_bytes(second)).encrypt_block(
+                DESEngine(self.first.key_bytes(first)).encrypt_block(plaintext)
+            )
+            == ciphertext
+        )
+
+    def run(
+        self, check: Optional[Tuple[bytes, bytes]] = None
+    ) -> List[Tuple[bytes, bytes]]:
+        """
+        Run the attack.
+
+        :param check: Another plaintext and ciphertext block pair used to
+            discard the false matches.
+        :return: The candidate key pairs (K1, K2).
+        """
+        with Pool(self.processes) as pool:
+            if self.first.size <= self.memory_limit:
+                matches = self._accept(self._join_in_memory(pool), check)
+            else:
+                with tempfile.TemporaryDirectory() as directory:
+                    matches = self._accept(self._join_on_disk(pool, directory), check)
+
+        return [
+            (self.first.key_bytes(first), self.second.key_bytes(second))
+            for first, second in matches
+        ]
+
+
+def main() -> None:
+    key = bytes.fromhex("AABB09182736CCDD")
+    plaintext = bytes.fromhex("123456ABCD132536")
+    ciphertext = DESEngine(key).encrypt_block(plaintext)
+
+    # The last 18 non-parity bits of the key are unknown
+    unknown = [bit for bit in range(64, 0, -1) if bit % 8][:18]
+    search = KeySearch(plaintext, ciphertext, KeySpace(key, unknown))
+    found = search.run(
+        progress=lambda tried, total: print(f"Tried {tried} of {total} keys", end="\r")
+    )
+    print(f"\nFound key : {', '.join(k.hex().upper() for k in found)}")
+
+    # Double DES with 10 unknown bits in each key, partitioned on disk
+    k1, k2 = key, bytes.fromhex("0123456789ABCDEF")
+    pairs = [
+        (block, DESEngine(k2).encrypt_block(DESEngine(k1).encrypt_block(block)))
+        for block in (plaintext, b"2DES MIM")
+    ]
+    attack = MeetInTheMiddle(
+        *pairs[0],
+        first=KeySpace(k1, unknown[:10]),
+        second=KeySpace(k2, unknown[:10]),
+        memory_limit=256,
+    )
+    for first, second in attack.run(check=pairs[1]):
+        print(f"Found key pair : {first.hex().upper()} {second.hex().upper()}")
+
+
+if __name__ == "__main__":
+    main()
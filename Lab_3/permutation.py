@@ -0,0 +1,134 @@
+#!/usr/bin/python3
+from functools import lru_cache
+from typing import Final, Sequence, Tuple
+
+from constant import initial_perm
+
+ByteTables = Tuple[Tuple[int, ...], ...]
+
+# Number of compiled permutations kept for reuse
+PLAN_CACHE_SIZE: Final[int] = 64
+
+
+def permute_bits(value: int, table: Sequence[int], in_bits: int) -> int:
+    """
+    Perform a DES permutation on an integer, one bit at a time.
+
+    :param value: The input value, bit 1 of the table being its most significant bit.
+    :param table: The 1-based permutation table.
+    :param in_bits: The width of the input value in bits.
+    :return: The permuted value, as wide as the table is long.
+    """
+    result = 0
+    for position in table:
+        result = (result << 1) | ((value >> (in_bits - position)) & 1)
+    return result
+
+
+def byte_tables(table: Sequence[int], in_bits: int) -> ByteTables:
+    """
+    Precompute a permutation as one 256-entry lookup table per input byte.
+
+    Every entry holds the output bits contributed by that byte value, so the
+    permutation of a whole value is the OR of one lookup per input byte. An
+    input that is not a whole number of bytes is padded on the left.
+
+    :param table: The 1-based permutation table.
+    :param in_bits: The width of the input value in bits.
+    :return: The lookup tables, starting from the most significant input byte.
+    """
+    count = -(-in_bits // 8)
+    mask = (1 << in_bits) - 1
+    return tuple(
+        tuple(
+            permute_bits((value << (8 * (count - i - 1))) & mask, table, in_bits)
+            for value in range(256)
+        )
+        for i in range(count)
+    )
+
+
+class CompiledPermutation:
+    """
+    A permutation table compiled into byte-sliced lookup tables.
+    """
+
+    __slots__ = ("table", "in_bits", "out_bits", "tables")
+
+    def __init__(self, table: Sequence[int], in_bits: int) -> None:
+        """
+        Compile the permutation.
+
+        :param table: The 1-based permutation table, as in constant.py.
+        :param in_bits: The width of the input value in bits.
+        """
+        if any(not 1 <= position <= in_bits for position in table):
+            raise ValueError(f"The table selects bits outside of {in_bits} input bits")
+
+        self.table: Final[Tuple[int, ...]] = tuple(table)
+        self.in_bits: Final[int] = in_bits
+        self.out_bits: Final[int] = len(table)
+        self.tables: Final[ByteTables] = byte_tables(table, in_bits)
+
+    def compiled_permute(self, value: int) -> int:
+        """
+        Permute an integer with one lookup per input byte.
+
+        :param value: The input value, bit 1 of the table being its most significant bit.
+        :return: The permuted value.
+        """
+        result = 0
+        shift = 8 * (len(self.tables) - 1)
+        for table in self.tables:
+            result |= table[(value >> shift) & 0xFF]
+            shift -= 8
+        return result
+
+    def permute_str(self, bits: str) -> str:
+        """
+        Permute a binary string, as des.permute does.
+
+        :param bits: The input as a string of in_bits binary digits.
+        :return: The permuted binary string.
+        """
+        return format(self.compiled_permute(int(bits, 2)), f"0{self.out_bits}b")
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def _compile(table: Tuple[int, ...], in_bits: int) -> CompiledPermutation:
+    """
+    Compile a permutation, keeping the most recently used ones.
+
+    :param table: The 1-based permutation table.
+    :param in_bits: The width of the input value in bits.
+    :return: The compiled permutation.
+    """
+    return CompiledPermutation(table, in_bits)
+
+
+def compile_permutation(table: Sequence[int], in_bits: int) -> CompiledPermutation:
+    """
+    Get the compiled form of a permutation, compiling it on first use.
+
+    :param table: The 1-based permutation table.
+    :param in_bits: The width of the input value in bits.
+    :return: The compiled permutation.
+    """
+    return _compile(tuple(table), in_bits)
+
+
+def main() -> None:
+    block = 0x123456ABCD132536
+
+    permutation = compile_permutation(initial_perm, 64)
+    result = permutation.compiled_permute(block)
+
+    return print(
+        f"Input : {block:016X}\n"
+        f"After initial permutation : {result:016X}\n"
+        f"Bit by bit : {permute_bits(block, initial_perm, 64):016X}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+from typing import Final, Tuple
+
+from des_engine import (
+    DESKey,
+    feistel_rounds,
+    final_permutation,
+    initial_permutation,
+)
+
+
+class TripleDES:
+    """
+    Triple DES in the encrypt-decrypt-encrypt construction with all 48 round keys precomputed.
+
+    The final permutation of one DES pass is immediately undone by the initial
+    permutation of the next one, so both are applied only once per block.
+    """
+
+    block_size: Final[int] = 8
+
+    def __init__(self, key: bytes) -> None:
+        """
+        Initialize the cipher and derive the round keys of all three passes.
+
+        :param key: 16 bytes for two-key (EDE2) or 24 bytes for three-key (EDE3) Triple DES.
+        """
+        if len(key) == 16:
+            key = bytes(key) + bytes(key[:8])
+        elif len(key) != 24:
+            raise ValueError("Triple DES key must be 16 or 24 bytes long")
+
+        k1, k2, k3 = (DESKey.from_bytes(key[i : i + 8]) for i in range(0, 24, 8))
+
+        # E(K1), D(K2), E(K3) for encryption and D(K3), E(K2), D(K1) for decryption
+        self.encryption_keys: Final[Tuple[Tuple[int, ...], ...]] = (
+            k1.encryption_keys,
+            k2.decryption_keys,
+            k3.encryption_keys,
+        )
+        self.decryption_keys: Final[Tuple[Tuple[int, ...], ...]] = (
+            k3.decryption_keys,
+            k2.encryption_keys,
+            k1.decryption_keys,
+        )
+
+    @staticmethod
+    def _crypt(block: int, passes: Tuple[Tuple[int, ...], ...]) -> int:
+        """
+        Run the three DES passes over a 64-bit block.
+
+        :param block: The input block.
+        :param passes: The round keys of every pass.
+        :return: The output block.
+        """
+        first, second, third = passes
+        block = feistel_rounds(initial_permutation(block), first)
+        block = feistel_rounds(block, second)
+        return final_permutation(feistel_rounds(block, third))
+
+    def encrypt_int(self, block: int) -> int:
+        """
+        Encrypt a 64-bit block given as an integer.
+
+        :param block: The plaintext block.
+        :return: The ciphertext block.
+        """
+        return self._crypt(block, self.encryption_keys)
+
+    def decrypt_int(self, block: int) -> int:
+        """
+        Decrypt a 64-bit block given as an integer.
+
+        :param block: The ciphertext block.
+        :return: The plaintext block.
+        """
+        return self._crypt(block, self.decryption_keys)
+
+    def encrypt_block(self, block: bytes) -> bytes:
+        """
+        Encrypt an 8-byte block.
+
+        :param block: The plaintext block.
+        :return: The ciphertext block.
+        """
+        if len(block) != 8:
+            raise ValueError("DES block must be 8 bytes long")
+        return self.encrypt_int(int.from_bytes(block, "big")).to_bytes(8, "big")
+
+    def decrypt_block(self, block: bytes) -> bytes:
+        """
+        Decrypt an 8-byte block.
+
+        :param block: The ciphertext block.
+        :return: The plaintext block.
+        """
+        if len(block) != 8:
+            raise ValueError("DES block must be 8 bytes long")
+        return self.decrypt_int(int.from_bytes(block, "big")).to_bytes(8, "big")
+
+
+def main() -> None:
+    key = bytes.fromhex("0123456789ABCDEF23456789ABCDEF01456789ABCDEF0123")
+    pt = b"The qufc"
+
+    cipher = TripleDES(key)
+    cipher_text = cipher.encrypt_block(pt)
+    plain_text = cipher.decrypt_block(cipher_text)
+
+    return print(
+        f"Cipher Text : {cipher_text.hex().upper()}\n"
+        f"Plain Text : {plain_text.decode()}"
+    )
+
+
+if __name__ == "__main__":
+    main()
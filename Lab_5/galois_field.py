@@ -1,10 +1,17 @@
 #!/usr/bin/python3
-from typing import Literal
+from functools import lru_cache
+from typing import Final, List, Literal, Tuple
+
+# The order of the multiplicative group of GF(2^8)
+ORDER: Final[int] = 255
 
 
 class GaloisField:
     """
     A class for operations in the Galois Field GF(2^8).
+
+    Multiplication by 02 and 03 is done with shifts, and the other operations
+    with log/antilog tables over the generator 03, built once with them.
     """
 
     @staticmethod
@@ -36,14 +43,139 @@ class GaloisField:
         # Multiplication by 02 (left shift by 1 bit) and addition of the original byte
         return GaloisField.mul02(byte=byte) ^ byte
 
+    @staticmethod
+    def mul(a: int, b: int) -> int:
+        """
+        Multiply two bytes in the Galois Field GF(2^8) modulo m(x).
+
+        The product takes O(1) table lookups. A zero factor is handled by a
+        branch, so the time is not constant.
+
+        :param a: The first factor.
+        :param b: The second factor.
+        :return: The product.
+        """
+        if not a or not b:
+            return 0
+
+        # The antilog table is doubled, so the sum of two logs needs no reduction
+        return EXP_TABLE[LOG_TABLE[a] + LOG_TABLE[b]]
+
+    @staticmethod
+    def inv(byte: int) -> int:
+        """
+        Find the multiplicative inverse of a byte.
+
+        :param byte: The input byte, not 0.
+        :return: The inverse.
+        """
+        if not byte:
+            raise ZeroDivisionError("0 has no inverse in GF(2^8)")
+        return EXP_TABLE[ORDER - LOG_TABLE[byte]]
+
+    @staticmethod
+    def div(a: int, b: int) -> int:
+        """
+        Divide two bytes in the Galois Field GF(2^8) modulo m(x).
+
+        :param a: The dividend.
+        :param b: The divisor, not 0.
+        :return: The quotient.
+        """
+        if not b:
+            raise ZeroDivisionError("Division by 0 in GF(2^8)")
+        if not a:
+            return 0
+        return EXP_TABLE[LOG_TABLE[a] - LOG_TABLE[b] + ORDER]
+
+    @staticmethod
+    def pow(byte: int, exponent: int) -> int:
+        """
+        Raise a byte to a power in the Galois Field GF(2^8) modulo m(x).
+
+        :param byte: The base.
+        :param exponent: The exponent, negative for a power of the inverse.
+        :return: The power.
+        """
+        if not byte:
+            if exponent < 0:
+                raise ZeroDivisionError("0 has no inverse in GF(2^8)")
+            return 0 if exponent else 1
+        return EXP_TABLE[LOG_TABLE[byte] * exponent % ORDER]
+
+    @staticmethod
+    def xtime(byte: int, n: int = 1) -> int:
+        """
+        Multiply a byte by x^n, that is by 02 n times, with table lookups.
+
+        :param byte: The input byte.
+        :param n: The number of times to multiply by 02.
+        :return: The product.
+        """
+        return GaloisField.mul(byte, GaloisField.pow(0x02, n))
+
+    @staticmethod
+    def mul_table() -> Tuple[bytes, ...]:
+        """
+        Get the full multiplication table, built on first use.
+
+        Row a holds the products of a by every byte, so it can also be used
+        as a translation table with bytes.translate.
+
+        :return: The 256 rows of 256 products.
+        """
+        return _mul_table()
+
+
+def _build_tables() -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """
+    Build the antilog and log tables by repeated multiplication by 03,
+    which generates all the non-zero bytes.
+
+    :return: The antilog table, doubled in length, and the log table.
+    """
+    exp: List[int] = [1] * (2 * ORDER)
+    log: List[int] = [0] * 256
+    for i in range(1, 2 * ORDER):
+        exp[i] = GaloisField.mul03(exp[i - 1])
+    for i in range(ORDER):
+        log[exp[i]] = i
+    return tuple(exp), tuple(log)
+
+
+@lru_cache(maxsize=None)
+def _mul_table() -> Tuple[bytes, ...]:
+    """
+    Build the full multiplication table.
+
+    :return: The 256 rows of 256 products.
+    """
+    return tuple(bytes(GaloisField.mul(a, b) for b in range(256)) for a in range(256))
+
+
+# EXP_TABLE[i] is 03^i, LOG_TABLE[b] is i such that 03^i = b
+EXP_TABLE, LOG_TABLE = _build_tables()
+
 
 def main() -> None:
     example_1: Literal[212] = 0xD4
     example_2: Literal[191] = 0xBF
+    example_3: Literal[83] = 0x53
+    example_4: Literal[202] = 0xCA
+
+    product: int = GaloisField.mul(example_3, example_4)
+    quotient: int = GaloisField.div(example_1, example_2)
+    table_product: int = GaloisField.mul_table()[example_3][example_4]
 
     return print(
         f"{hex(example_1)} * 02 = {hex(GaloisField.mul02(example_1))}\n"
-        f"{hex(example_2)} * 03 = {hex(GaloisField.mul03(example_2))}"
+        f"{hex(example_2)} * 03 = {hex(GaloisField.mul03(example_2))}\n"
+        f"{hex(example_3)} * {hex(example_4)} = {hex(product)}\n"
+        f"{hex(example_3)} ^ -1 = {hex(GaloisField.inv(example_3))}\n"
+        f"{hex(example_1)} / {hex(example_2)} = {hex(quotient)}\n"
+        f"{hex(example_2)} ^ 3 = {hex(GaloisField.pow(example_2, 3))}\n"
+        f"{hex(example_1)} * x^4 = {hex(GaloisField.xtime(example_1, 4))}\n"
+        f"Table {hex(example_3)} * {hex(example_4)} = {hex(table_product)}"
     )
 
 
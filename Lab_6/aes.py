@@ -1,7 +1,11 @@
 #!/usr/bin/python3
-from typing import List
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
-from constant import RCON, S_BOX
+from aes_engine import AESKey, expand_key, xtime
+from constant import S_BOX
+
+# An observer receives the name of a stage, the round number and the state
+RoundObserver = Callable[[str, int, Dict[str, Any]], None]
 
 
 def key_expansion(key: bytes) -> List[List[int]]:
@@ -11,22 +15,20 @@ def key_expansion(key: bytes) -> List[List[int]]:
     :param key: The AES key as bytes (16, 24, or 32 bytes).
     :return: The key schedule as a list of 4-byte words.
     """
-    key_schedule: List[List[int]] = [
-        list(key[i : i + 4]) for i in range(0, len(key), 4)
-    ]
+    return [list(word.to_bytes(4, "big")) for word in expand_key(key)]
 
-    while len(key_schedule) < 44:
-        word = key_schedule[-1]
-        if len(key_schedule) % 4 == 0:
-            # Rotate word
-            word = [word[1], word[2], word[3], word[0]]
-            # SubBytes
-            word = [S_BOX[b] for b in word]
-            # XOR with RCON
-            word[0] ^= RCON[len(key_schedule) // 4 - 1]
-        key_schedule.append([a ^ b for a, b in zip(key_schedule[-4], word)])
 
-    return key_schedule
+def cached_key_expansion(key: bytes) -> Tuple[Tuple[int, ...], ...]:
+    """
+    Get the key schedule from the expanded keys cached by AESKey.from_bytes.
+
+    :param key: The AES key as bytes (16, 24, or 32 bytes).
+    :return: The key schedule as a tuple of 4-byte words.
+    """
+    return tuple(
+        tuple(word.to_bytes(4, "big"))
+        for word in AESKey.from_bytes(key).encryption_keys
+    )
 
 
 def sub_bytes(state: List[List[int]]) -> List[List[int]]:
@@ -43,39 +45,36 @@ def shift_rows(state: List[List[int]]) -> List[List[int]]:
     """
     Apply the ShiftRows operation to the AES state.
 
-    :param state: The current state of the AES encryption.
+    :param state: The current state of the AES encryption, a list of columns.
     :return: The state after applying the ShiftRows operation.
     """
-    return [row[i:] + row[:i] for i, row in enumerate(state)]
+    # Row r is rotated left by r, so it takes its byte from column c + r
+    return [[state[(c + r) % 4][r] for r in range(4)] for c in range(4)]
 
 
 def mix_columns(state: List[List[int]]) -> List[List[int]]:
     """
     Apply the MixColumns operation to the AES state.
 
-    :param state: The current state of the AES encryption.
+    :param state: The current state of the AES encryption, a list of columns.
     :return: The state after applying the MixColumns operation.
     """
 
-    def mix_column(column):
+    def mix_column(column: List[int]) -> List[int]:
+        # Multiplication by (02, 03, 01, 01) in GF(2^8), 03 * x being 02 * x ^ x
         result = []
         for i in range(4):
+            a, b = column[i], column[(i + 1) % 4]
             result.append(
-                (
-                    2 * column[i]
-                    ^ 3 * column[(i + 1) % 4]
-                    ^ column[(i + 2) % 4]
-                    ^ column[(i + 3) % 4]
-                )
-                % 256
+                xtime(a) ^ xtime(b) ^ b ^ column[(i + 2) % 4] ^ column[(i + 3) % 4]
             )
         return result
 
-    return [mix_column(column) for column in zip(*state)]
+    return [mix_column(column) for column in state]
 
 
 def add_round_key(
-    state: List[List[int]], round_key: List[List[int]]
+    state: List[List[int]], round_key: Sequence[Sequence[int]]
 ) -> List[List[int]]:
     """
     Add the current round key to the AES state.
@@ -90,28 +89,48 @@ def add_round_key(
     ]
 
 
-def aes_encrypt(plaintext: bytes, key: bytes) -> bytes:
+def aes_encrypt(
+    plaintext: bytes, key: bytes, observer: Optional[RoundObserver] = None
+) -> bytes:
     """
     Encrypt the given plaintext using AES with the specified key.
 
     :param plaintext: The plaintext to be encrypted as bytes.
     :param key: The AES key as bytes (16, 24, or 32 bytes).
+    :param observer: Called with the state after every step of every round.
+        Nothing is reported when it is not given.
     :return: The encrypted ciphertext as bytes.
     """
-    key_schedule = key_expansion(key)
+    key_schedule = cached_key_expansion(bytes(key))
+    rounds = len(key_schedule) // 4 - 1
+
+    # The state is the list of the four columns, as the plaintext is laid out
     state = [list(plaintext[i : i + 4]) for i in range(0, len(plaintext), 4)]
+    if observer is not None:
+        observer("input", 0, {"state": state, "rounds": rounds})
 
     state = add_round_key(state, key_schedule[:4])
+    if observer is not None:
+        observer("add_round_key", 0, {"state": state, "rounds": rounds})
 
-    for round_num in range(1, 10):
+    for round_num in range(1, rounds + 1):
         state = sub_bytes(state)
+        if observer is not None:
+            observer("sub_bytes", round_num, {"state": state, "rounds": rounds})
+
         state = shift_rows(state)
-        state = mix_columns(state)
-        state = add_round_key(state, key_schedule[round_num * 4 : (round_num + 1) * 4])
+        if observer is not None:
+            observer("shift_rows", round_num, {"state": state, "rounds": rounds})
 
-    state = sub_bytes(state)
-    state = shift_rows(state)
-    state = add_round_key(state, key_schedule[40:])
+        # The final round has no MixColumns
+        if round_num != rounds:
+            state = mix_columns(state)
+            if observer is not None:
+                observer("mix_columns", round_num, {"state": state, "rounds": rounds})
+
+        state = add_round_key(state, key_schedule[round_num * 4 : (round_num + 1) * 4])
+        if observer is not None:
+            observer("add_round_key", round_num, {"state": state, "rounds": rounds})
 
     ciphertext = [byte for row in state for byte in row]
     return bytes(ciphertext)
@@ -132,42 +151,45 @@ def aes_round(state: List[List[int]], round_key: List[List[int]]) -> List[List[i
     return state
 
 
+def print_round(stage: str, round_num: int, state: Dict[str, Any]) -> None:
+    """
+    Print the intermediate states of AES, an observer for aes_encrypt.
+
+    :param stage: The step that was just applied, or "input".
+    :param round_num: The round number, 0 for the initial round.
+    :param state: The AES state and the number of rounds.
+    """
+    if stage == "input":
+        print("Initial state:", state["state"])
+        return
+
+    # The first step of a round opens it
+    if round_num == 0:
+        print("\nRound 0 - Initial Round:")
+    elif stage == "sub_bytes":
+        if round_num == state["rounds"]:
+            print(f"\nRound {round_num} - Final Round:")
+        else:
+            print(f"\nRound {round_num}:")
+
+    names: Dict[str, str] = {
+        "sub_bytes": "SubBytes",
+        "shift_rows": "ShiftRows",
+        "mix_columns": "MixColumns",
+        "add_round_key": "AddRoundKey",
+    }
+    print(f"State after {names[stage]}:", state["state"])
+
+
 def main():
     plaintext = bytes.fromhex("3243F6A8885A308D313198A2E0370734")
     key = bytes.fromhex("2B7E151628AED2A6ABF7158809CF4F3C")
 
-    key_schedule = key_expansion(key)
-    state = [list(plaintext[i : i + 4]) for i in range(0, len(plaintext), 4)]
-
     print("Plaintext:", plaintext.hex())
-    print("Initial state:", state)
-
-    # Initial round
-    state = add_round_key(state, key_schedule[:4])
-    print("\nRound 0 - Initial Round:")
-    print("State after AddRoundKey:", state)
-
-    # 9 main rounds
-    for round_num in range(1, 10):
-        state = aes_round(state, key_schedule[round_num * 4 : (round_num + 1) * 4])
-        print(f"\nRound {round_num}:")
-        print("State after SubBytes:", sub_bytes(state))
-        print("State after ShiftRows:", shift_rows(state))
-        print("State after MixColumns:", mix_columns(state))
-        print("State after AddRoundKey:", state)
-
-    # Final round
-    state = sub_bytes(state)
-    state = shift_rows(state)
-    state = add_round_key(state, key_schedule[40:])
-    print("\nRound 10 - Final Round:")
-    print("State after SubBytes:", state)
-    print("State after ShiftRows:", shift_rows(state))
-    print("State after AddRoundKey:", state)
+    encrypted_result = aes_encrypt(plaintext, key, observer=print_round)
 
     # Output the final encrypted result
-    encrypted_result = [byte for row in state for byte in row]
-    print("\nEncrypted Result:", bytes(encrypted_result).hex())
+    print("\nEncrypted Result:", encrypted_result.hex())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,263 @@
+#!/usr/bin/python3
+from typing import Final, List, Sequence, Tuple, Union
+
+from aes_engine import INV_S_BOX, AESEngine, AESKey, gf_mul
+from constant import S_BOX
+
+BLOCK_SIZE: Final[int] = 16
+MASK_128: Final[int] = (1 << 128) - 1
+
+# Number of blocks processed together, small enough to stay in the cache
+BATCH_BLOCKS: Final[int] = 1 << 11
+
+# Byte translation tables applied to a whole batch
+SUB_BYTES: Final[bytes] = bytes(S_BOX)
+INV_SUB_BYTES: Final[bytes] = bytes(INV_S_BOX)
+TIMES_2: Final[bytes] = bytes(gf_mul(byte, 0x02) for byte in range(256))
+TIMES_4: Final[bytes] = bytes(gf_mul(byte, 0x04) for byte in range(256))
+
+Gather = Tuple[int, ...]
+Masks = List[Tuple[int, int]]
+
+
+def shift_rows(direction: int) -> Gather:
+    """
+    Compute where every byte of a block comes from after ShiftRows or InvShiftRows.
+
+    Byte 4c + r of a block is row r of column c.
+
+    :param direction: 1 for ShiftRows, -1 for InvShiftRows.
+    :return: For every output byte, the input byte it comes from.
+    """
+    return tuple(4 * ((c + direction * r) % 4) + r for c in range(4) for r in range(4))
+
+
+SHIFT_ROWS: Final[Gather] = shift_rows(1)
+INV_SHIFT_ROWS: Final[Gather] = shift_rows(-1)
+
+
+def gather(state: bytes, sources: Gather) -> bytes:
+    """
+    Rearrange the bytes of every block of a batch the same way.
+
+    :param state: The blocks joined together.
+    :param sources: For every output byte of a block, the input byte it comes from.
+    :return: The rearranged blocks.
+    """
+    output = bytearray(len(state))
+    for i, source in enumerate(sources):
+        output[i::BLOCK_SIZE] = state[source::BLOCK_SIZE]
+    return bytes(output)
+
+
+def rotation_masks(count: int) -> Masks:
+    """
+    Build the masks rotating every column of a batch held as one big integer.
+
+    Row r of a column taking row r + k is a left rotation of its 32-bit word
+    by k bytes: the bytes shifted left stay in their word under the first
+    mask, the ones shifted right under the second.
+
+    :param count: The number of blocks.
+    :return: The two masks of the rotations by 1 and 2 rows.
+    """
+    return [
+        (
+            int.from_bytes(
+                ((1 << 32) - (1 << 8 * k)).to_bytes(4, "big") * 4 * count, "big"
+            ),
+            int.from_bytes(((1 << 8 * k) - 1).to_bytes(4, "big") * 4 * count, "big"),
+        )
+        for k in (1, 2)
+    ]
+
+
+def rotate(value: int, rows: int, masks: Masks) -> int:
+    """
+    Rotate every column of a batch, row r taking row r + rows.
+
+    :param value: The blocks joined together as one big integer.
+    :param rows: The number of rows, 1 or 2.
+    :param masks: The masks of the batch.
+    :return: The rotated blocks as one big integer.
+    """
+    high, low = masks[rows - 1]
+    return ((value << 8 * rows) & high) | ((value >> 32 - 8 * rows) & low)
+
+
+def translate(value: int, length: int, table: bytes) -> int:
+    """
+    Substitute every byte of a batch held as one big integer.
+
+    :param value: The blocks joined together as one big integer.
+    :param length: The length of the batch in bytes.
+    :param table: The translation table.
+    :return: The substituted blocks as one big integer.
+    """
+    return int.from_bytes(value.to_bytes(length, "big").translate(table), "big")
+
+
+def round_key_bytes(words: Sequence[int]) -> List[bytes]:
+    """
+    Convert round key words to one 16-byte string per round.
+
+    :param words: The round key words, four per round.
+    :return: The round keys.
+    """
+    return [
+        b"".join(word.to_bytes(4, "big") for word in words[i : i + 4])
+        for i in range(0, len(words), 4)
+    ]
+
+
+class BatchAES:
+    """
+    AES over many independent blocks at once.
+
+    The blocks are joined into one string and every step of a round is done
+    for the whole batch: SubBytes with bytes.translate, ShiftRows with 16
+    strided slice copies, MixColumns by rotating the columns of the batch
+    held as one big integer and doubling with bytes.translate, and
+    AddRoundKey as one XOR against the round key repeated for every block.
+    """
+
+    def __init__(self, key: Union[bytes, AESKey, AESEngine]) -> None:
+        """
+        Initialize the engine.
+
+        :param key: The AES key, its expanded form, or an AESEngine.
+        """
+        if isinstance(key, AESEngine):
+            key = key.key
+        elif not isinstance(key, AESKey):
+            key = AESKey.from_bytes(key)
+
+        self.key: Final[AESKey] = key
+        self.rounds: Final[int] = key.rounds
+        self._encryption_keys: Final[List[bytes]] = round_key_bytes(key.encryption_keys)
+        self._decryption_keys: Final[List[bytes]] = round_key_bytes(key.decryption_keys)
+
+    def _crypt(self, state: bytes, decrypt: bool) -> bytes:
+        """
+        Run the rounds of the cipher or of the equivalent inverse cipher on a batch.
+
+        :param state: The blocks joined together.
+        :param decrypt: True for decryption, False for encryption.
+        :return: The processed blocks joined together.
+        """
+        if decrypt:
+            round_keys, sbox, shift = (
+                self._decryption_keys,
+                INV_SUB_BYTES,
+                INV_SHIFT_ROWS,
+            )
+        else:
+            round_keys, sbox, shift = self._encryption_keys, SUB_BYTES, SHIFT_ROWS
+
+        length = len(state)
+        count = length // BLOCK_SIZE
+        keys = [int.from_bytes(key * count, "big") for key in round_keys]
+        masks = rotation_masks(count)
+
+        # Initial AddRoundKey
+        value = int.from_bytes(state, "big") ^ keys[0]
+
+        for i in range(1, self.rounds):
+            shifted = gather(value.to_bytes(length, "big").translate(sbox), shift)
+            column = int.from_bytes(shifted, "big")
+
+            # InvMixColumns is MixColumns after a_r ^= 04 * (a_r ^ a_r+2)
+            if decrypt:
+                column ^= translate(column ^ rotate(column, 2, masks), length, TIMES_4)
+
+            # 02 * a_r ^ 03 * a_r+1 ^ a_r+2 ^ a_r+3 is 02 * t_r ^ a_r+1 ^ t_r+2
+            # with t = a ^ rotate(a, 1)
+            rotated = rotate(column, 1, masks)
+            column ^= rotated
+            value = (
+                translate(column, length, TIMES_2)
+                ^ rotated
+                ^ rotate(column, 2, masks)
+                ^ keys[i]
+            )
+
+        # The final round has no MixColumns
+        shifted = gather(value.to_bytes(length, "big").translate(sbox), shift)
+        value = int.from_bytes(shifted, "big") ^ keys[-1]
+        return value.to_bytes(length, "big")
+
+    def _batches(self, data: bytes, decrypt: bool) -> bytes:
+        """
+        Process a whole number of blocks, a batch at a time.
+
+        :param data: The input blocks joined together.
+        :param decrypt: True for decryption, False for encryption.
+        :return: The output blocks joined together.
+        """
+        if len(data) % BLOCK_SIZE:
+            raise ValueError("The data is not a whole number of blocks")
+
+        view = memoryview(data)
+        step = BATCH_BLOCKS * BLOCK_SIZE
+        return b"".join(
+            self._crypt(bytes(view[i : i + step]), decrypt)
+            for i in range(0, len(view), step)
+        )
+
+    def encrypt_blocks(self, data: bytes) -> bytes:
+        """
+        Encrypt independent blocks, as in ECB mode.
+
+        :param data: The plaintext blocks joined together.
+        :return: The ciphertext blocks joined together.
+        """
+        return self._batches(data, decrypt=False)
+
+    def decrypt_blocks(self, data: bytes) -> bytes:
+        """
+        Decrypt independent blocks, as in ECB mode.
+
+        :param data: The ciphertext blocks joined together.
+        :return: The plaintext blocks joined together.
+        """
+        return self._batches(data, decrypt=True)
+
+    def keystream_blocks(self, counter: bytes, index: int, count: int) -> bytes:
+        """
+        Generate consecutive counter mode keystream blocks, as AESCTR does.
+
+        :param counter: The 16-byte initial counter block.
+        :param index: The index of the first block.
+        :param count: The number of blocks.
+        :return: The keystream blocks joined together.
+        """
+        if len(counter) != BLOCK_SIZE:
+            raise ValueError("The initial counter block must be 16 bytes long")
+
+        first = int.from_bytes(counter, "big") + index
+        return self.encrypt_blocks(
+            b"".join(
+                (value & MASK_128).to_bytes(BLOCK_SIZE, "big")
+                for value in range(first, first + count)
+            )
+        )
+
+
+def main() -> None:
+    # FIPS-197, Appendix C.1, the same block four times
+    key = bytes.fromhex("000102030405060708090A0B0C0D0E0F")
+    plaintext = bytes.fromhex("00112233445566778899AABBCCDDEEFF")
+
+    engine = BatchAES(key)
+    cipher_text = engine.encrypt_blocks(plaintext * 4)
+    plain_text = engine.decrypt_blocks(cipher_text)
+
+    return print(
+        f"Cipher Text : {cipher_text[:16].hex().upper()}\n"
+        f"Same blocks : {cipher_text == cipher_text[:16] * 4}\n"
+        f"Plain Text : {plain_text[:16].hex().upper()}"
+    )
+
+
+if __name__ == "__main__":
+    main()
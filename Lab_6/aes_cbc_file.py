@@ -0,0 +1,257 @@
+#!/usr/bin/python3
+import mmap
+import os
+import tempfile
+from typing import Callable, Final, Optional, Union
+
+from aes_engine import BLOCK, AESEngine, AESKey
+
+BLOCK_SIZE: Final[int] = 16
+
+# Preferred number of bytes processed between two checkpoints
+FILE_CHUNK_SIZE: Final[int] = 1 << 24
+
+Path = Union[str, os.PathLike]
+Progress = Callable[[int], None]
+
+
+def _aligned(chunk_size: int) -> int:
+    """
+    Round a chunk size to a whole number of mapping pages.
+
+    :param chunk_size: The preferred chunk size in bytes.
+    :return: The chunk size used, a multiple of the allocation granularity.
+    """
+    return max(1, chunk_size // mmap.ALLOCATIONGRANULARITY) * mmap.ALLOCATIONGRANULARITY
+
+
+def _release(mapping: mmap.mmap, start: int, stop: int) -> None:
+    """
+    Drop processed pages of a mapping from memory, so the resident size stays flat.
+
+    :param mapping: The mapping.
+    :param start: The offset of the first page, aligned.
+    :param stop: The offset after the last byte.
+    """
+    if hasattr(mmap, "MADV_DONTNEED") and stop > start:
+        mapping.madvise(mmap.MADV_DONTNEED, start, stop - start)
+
+
+class AESCBCFile:
+    """
+    AES-CBC encryption of whole files with PKCS#7 padding, in constant memory.
+
+    The input is memory-mapped and the output is preallocated and written
+    through a mapping. Blocks are read and written in place as four integers,
+    and processed pages are released after every chunk. Chunks are aligned
+    to mapping pages, and an interrupted run can be resumed at any chunk
+    boundary, since CBC only needs the previous ciphertext block there.
+    """
+
+    def __init__(
+        self, key: Union[bytes, AESKey, AESEngine], chunk_size: int = FILE_CHUNK_SIZE
+    ) -> None:
+        """
+        Initialize the cipher.
+
+        :param key: The AES key, its expanded form, or an AESEngine.
+        :param chunk_size: The preferred number of bytes between two checkpoints.
+        """
+        self.engine: Final[AESEngine] = (
+            key if isinstance(key, AESEngine) else AESEngine(key)
+        )
+        self.chunk_size: Final[int] = _aligned(chunk_size)
+
+    def _check_resume(self, start: int, iv: bytes) -> None:
+        """
+        Validate the arguments of a run.
+
+        :param start: The offset to resume from.
+        :param iv: The initialization vector.
+        """
+        if len(iv) != BLOCK_SIZE:
+            raise ValueError("The IV must be 16 bytes long")
+        if start < 0 or start % self.chunk_size:
+            raise ValueError("The run can only be resumed at a chunk boundary")
+
+    def encrypt_file(
+        self,
+        source: Path,
+        destination: Path,
+        iv: bytes,
+        start: int = 0,
+        progress: Optional[Progress] = None,
+    ) -> None:
+        """
+        Encrypt a file.
+
+        :param source: The path of the file to be encrypted.
+        :param destination: The path of the encrypted file.
+        :param iv: The 16-byte initialization vector.
+        :param start: The offset to resume from, a chunk boundary reported by
+            progress during an earlier run with the same arguments.
+        :param progress: Called with the offset of the input processed so far at
+            every chunk boundary, once the output up to it is flushed to disk,
+            and with the input length at the end.
+        """
+        self._check_resume(start, iv)
+        encrypt = self.engine.encrypt_words
+        unpack_from, pack_into = BLOCK.unpack_from, BLOCK.pack_into
+
+        with open(source, "rb") as reader, open(
+            destination, "r+b" if start else "w+b"
+        ) as writer:
+            length: int = os.fstat(reader.fileno()).st_size
+            padded: int = length - length % BLOCK_SIZE + BLOCK_SIZE
+            whole: int = length - length % BLOCK_SIZE
+            if start > whole:
+                raise ValueError("The offset is beyond the end of the input")
+
+            # Preallocate the output and write it through a mapping
+            writer.truncate(padded)
+            with mmap.mmap(writer.fileno(), padded) as output:
+                # The chaining value is the IV or the last ciphertext block written
+                c0, c1, c2, c3 = (
+                    unpack_from(output, start - BLOCK_SIZE)
+                    if start
+                    else BLOCK.unpack(iv)
+                )
+
+                data = (
+                    mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_READ)
+                    if length
+                    else b""
+                )
+                try:
+                    for chunk in range(start, whole, self.chunk_size):
+                        stop = min(chunk + self.chunk_size, whole)
+                        for offset in range(chunk, stop, BLOCK_SIZE):
+                            p0, p1, p2, p3 = unpack_from(data, offset)
+                            c0, c1, c2, c3 = encrypt(p0 ^ c0, p1 ^ c1, p2 ^ c2, p3 ^ c3)
+                            pack_into(output, offset, c0, c1, c2, c3)
+
+                        output.flush(chunk, stop - chunk)
+                        if isinstance(data, mmap.mmap):
+                            _release(data, chunk, stop)
+                        _release(output, chunk, stop)
+                        if progress is not None and stop != whole:
+                            progress(stop)
+
+                    # The last block holds the rest of the input and the padding
+                    padding = padded - length
+                    p0, p1, p2, p3 = BLOCK.unpack(
+                        bytes(data[whole:length]) + bytes((padding,)) * padding
+                    )
+                    pack_into(
+                        output, whole, *encrypt(p0 ^ c0, p1 ^ c1, p2 ^ c2, p3 ^ c3)
+                    )
+                    output.flush()
+                finally:
+                    if isinstance(data, mmap.mmap):
+                        data.close()
+        if progress is not None:
+            progress(length)
+
+    def decrypt_file(
+        self,
+        source: Path,
+        destination: Path,
+        iv: bytes,
+        start: int = 0,
+        progress: Optional[Progress] = None,
+    ) -> None:
+        """
+        Decrypt a file produced by encrypt_file, restoring its exact length.
+
+        When the padding turns out to be invalid, the output file is removed.
+
+        :param source: The path of the encrypted file.
+        :param destination: The path of the decrypted file.
+        :param iv: The 16-byte initialization vector.
+        :param start: The offset to resume from, a chunk boundary reported by
+            progress during an earlier run with the same arguments.
+        :param progress: Called with the offset of the input processed so far at
+            every chunk boundary, once the output up to it is flushed to disk,
+            and with the input length at the end.
+        """
+        self._check_resume(start, iv)
+        decrypt = self.engine.decrypt_words
+        unpack_from, pack_into = BLOCK.unpack_from, BLOCK.pack_into
+
+        with open(source, "rb") as reader, open(
+            destination, "r+b" if start else "w+b"
+        ) as writer:
+            length: int = os.fstat(reader.fileno()).st_size
+            if not length or length % BLOCK_SIZE:
+                raise ValueError("The data is not a whole number of blocks")
+            if start >= length:
+                raise ValueError("The offset is beyond the end of the input")
+
+            writer.truncate(length)
+            with mmap.mmap(writer.fileno(), length) as output, mmap.mmap(
+                reader.fileno(), 0, access=mmap.ACCESS_READ
+            ) as data:
+                # The chaining value is the IV or the previous ciphertext block
+                c0, c1, c2, c3 = (
+                    unpack_from(data, start - BLOCK_SIZE) if start else BLOCK.unpack(iv)
+                )
+
+                for chunk in range(start, length, self.chunk_size):
+                    stop = min(chunk + self.chunk_size, length)
+                    for offset in range(chunk, stop, BLOCK_SIZE):
+                        n0, n1, n2, n3 = unpack_from(data, offset)
+                        p0, p1, p2, p3 = decrypt(n0, n1, n2, n3)
+                        pack_into(output, offset, p0 ^ c0, p1 ^ c1, p2 ^ c2, p3 ^ c3)
+                        c0, c1, c2, c3 = n0, n1, n2, n3
+
+                    output.flush(chunk, stop - chunk)
+                    _release(data, chunk, stop)
+                    _release(output, chunk, stop)
+                    if progress is not None and stop != length:
+                        progress(stop)
+
+                # Check the padding of the last block
+                padding = output[length - 1]
+                valid = (
+                    1 <= padding <= BLOCK_SIZE
+                    and output[length - padding : length] == bytes((padding,)) * padding
+                )
+
+            # Strip the padding, or drop everything written on failure
+            writer.truncate(length - padding if valid else 0)
+        if not valid:
+            os.remove(destination)
+            raise ValueError("Invalid padding")
+        if progress is not None:
+            progress(length)
+
+
+def main() -> None:
+    key = bytes.fromhex("2B7E151628AED2A6ABF7158809CF4F3C")
+    iv = bytes.fromhex("000102030405060708090A0B0C0D0E0F")
+    message = b"Constant-memory AES-CBC over memory-mapped files. " * 4096
+
+    with tempfile.TemporaryDirectory() as directory:
+        plain_path = os.path.join(directory, "plain.bin")
+        cipher_path = os.path.join(directory, "cipher.bin")
+        restored_path = os.path.join(directory, "restored.bin")
+        with open(plain_path, "wb") as file:
+            file.write(message)
+
+        cipher = AESCBCFile(key, chunk_size=1 << 16)
+        cipher.encrypt_file(plain_path, cipher_path, iv)
+        cipher.decrypt_file(cipher_path, restored_path, iv)
+
+        with open(cipher_path, "rb") as file:
+            head = file.read(32)
+        with open(restored_path, "rb") as file:
+            restored = file.read()
+
+    return print(
+        f"Cipher Text : {head.hex().upper()}...\n"
+        f"Restored : {restored == message} ({len(restored)} bytes)"
+    )
+
+
+if __name__ == "__main__":
+    main()
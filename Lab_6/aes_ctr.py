@@ -0,0 +1,177 @@
+#!/usr/bin/python3
+from typing import Final, Union
+
+from aes_engine import BLOCK, AESEngine, AESKey
+
+BLOCK_SIZE: Final[int] = 16
+MASK_32: Final[int] = (1 << 32) - 1
+MASK_128: Final[int] = (1 << 128) - 1
+
+# Number of keystream blocks generated and XORed in one pass
+BATCH_BLOCKS: Final[int] = 1 << 12
+
+
+def xor_bytes(data: bytes, keystream: bytes) -> bytes:
+    """
+    XOR two byte strings of equal length as two big integers.
+
+    :param data: The input data.
+    :param keystream: The keystream.
+    :return: The XOR of the inputs.
+    """
+    return (int.from_bytes(data, "big") ^ int.from_bytes(keystream, "big")).to_bytes(
+        len(data), "big"
+    )
+
+
+class AESCTR:
+    """
+    AES in counter mode with random access to the keystream.
+
+    Block i of the keystream is the encryption of the initial counter block
+    plus i, modulo 2^128, so any byte of the stream can be produced without
+    the ones before it. Encryption and decryption are the same operation.
+    """
+
+    def __init__(self, key: Union[bytes, AESKey, AESEngine], counter: bytes) -> None:
+        """
+        Initialize the mode.
+
+        :param key: The AES key, its expanded form, or an AESEngine.
+        :param counter: The 16-byte initial counter block.
+        """
+        if len(counter) != BLOCK_SIZE:
+            raise ValueError("The initial counter block must be 16 bytes long")
+
+        self.engine: Final[AESEngine] = (
+            key if isinstance(key, AESEngine) else AESEngine(key)
+        )
+        self.counter: Final[int] = int.from_bytes(counter, "big")
+        self._position: int = 0
+
+        # The last keystream block generated, reused by the next call
+        self._cached_index: int = -1
+        self._cached_block: bytes = b""
+
+    def seek(self, offset: int) -> None:
+        """
+        Move to a byte offset of the stream.
+
+        :param offset: The offset from the start of the stream.
+        """
+        if offset < 0:
+            raise ValueError("The offset must not be negative")
+        self._position = offset
+
+    def tell(self) -> int:
+        """
+        Get the current byte offset of the stream.
+
+        :return: The offset from the start of the stream.
+        """
+        return self._position
+
+    def keystream_blocks(self, index: int, count: int) -> bytearray:
+        """
+        Generate consecutive keystream blocks in one call.
+
+        :param index: The index of the first block.
+        :param count: The number of blocks.
+        :return: The keystream blocks joined together.
+        """
+        encrypt, pack_into = self.engine.encrypt_words, BLOCK.pack_into
+        stream = bytearray(BLOCK_SIZE * count)
+        counter = self.counter + index
+        for offset, value in zip(
+            range(0, len(stream), BLOCK_SIZE), range(counter, counter + count)
+        ):
+            value &= MASK_128
+            pack_into(
+                stream,
+                offset,
+                *encrypt(
+                    value >> 96,
+                    (value >> 64) & MASK_32,
+                    (value >> 32) & MASK_32,
+                    value & MASK_32,
+                ),
+            )
+        return stream
+
+    def keystream(self, length: int) -> bytes:
+        """
+        Get the keystream from the current offset and move past it.
+
+        :param length: The number of bytes.
+        :return: The keystream.
+        """
+        if length <= 0:
+            return b""
+
+        start = self._position
+        end = start + length
+        first, last = start // BLOCK_SIZE, -(-end // BLOCK_SIZE)
+
+        # The block the previous call ended in is not generated again
+        if first == self._cached_index:
+            stream = self._cached_block + self.keystream_blocks(
+                first + 1, last - first - 1
+            )
+        else:
+            stream = self.keystream_blocks(first, last - first)
+
+        self._cached_index = last - 1
+        self._cached_block = bytes(stream[-BLOCK_SIZE:])
+        self._position = end
+
+        offset = start - first * BLOCK_SIZE
+        return bytes(memoryview(stream)[offset : offset + length])
+
+    def update(self, data: bytes) -> bytes:
+        """
+        Encrypt or decrypt data at the current offset and move past it.
+
+        :param data: The input data.
+        :return: The output data.
+        """
+        view = memoryview(data)
+        output = bytearray()
+        for i in range(0, len(view), BATCH_BLOCKS * BLOCK_SIZE):
+            chunk = view[i : i + BATCH_BLOCKS * BLOCK_SIZE]
+            output += xor_bytes(chunk, self.keystream(len(chunk)))
+        return bytes(output)
+
+    def crypt_range(self, data: bytes, offset: int) -> bytes:
+        """
+        Encrypt or decrypt a range of the stream, as for a byte-range read.
+
+        :param data: The input bytes found at the offset.
+        :param offset: The offset of the range from the start of the stream.
+        :return: The output bytes.
+        """
+        self.seek(offset)
+        return self.update(data)
+
+
+def main() -> None:
+    # NIST SP 800-38A, F.5.1 CTR-AES128.Encrypt
+    key = bytes.fromhex("2B7E151628AED2A6ABF7158809CF4F3C")
+    counter = bytes.fromhex("F0F1F2F3F4F5F6F7F8F9FAFBFCFDFEFF")
+    plaintext = bytes.fromhex(
+        "6BC1BEE22E409F96E93D7E117393172AAE2D8A571E03AC9C9EB76FAC45AF8E51"
+        "30C81C46A35CE411E5FBC1191A0A52EFF69F2445DF4F9B17AD2B417BE66C3710"
+    )
+
+    cipher_text = AESCTR(key, counter).update(plaintext)
+
+    # Only the third block and a half, without decrypting what comes before
+    part = AESCTR(key, counter).crypt_range(cipher_text[32:56], offset=32)
+
+    return print(
+        f"Cipher Text : {cipher_text.hex().upper()}\n"
+        f"Bytes 32-55 : {part.hex().upper()}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,482 @@
+#!/usr/bin/python3
+import struct
+from functools import lru_cache
+from typing import Final, List, Tuple, Union
+
+from constant import RCON, S_BOX
+
+WordTable = Tuple[int, ...]
+Words = Tuple[int, int, int, int]
+
+# Number of expanded keys kept for reuse
+KEY_CACHE_SIZE: Final[int] = 512
+
+# A block as four big-endian 32-bit column words
+BLOCK: Final[struct.Struct] = struct.Struct(">4I")
+
+
+def xtime(byte: int) -> int:
+    """
+    Multiply a byte by 02 in the Galois Field GF(2^8) modulo m(x).
+
+    :param byte: The input byte.
+    :return: The product.
+    """
+    result = byte << 1
+    # 0x11b represents the polynomial m(x), the carry is reduced by it
+    return result ^ 0x11B if result & 0x100 else result
+
+
+def gf_mul(a: int, b: int) -> int:
+    """
+    Multiply two bytes in the Galois Field GF(2^8) modulo m(x).
+
+    :param a: The first factor.
+    :param b: The second factor.
+    :return: The product.
+    """
+    result = 0
+    while b:
+        if b & 1:
+            result ^= a
+        a, b = xtime(a), b >> 1
+    return result
+
+
+def rotate_word(word: int, bits: int) -> int:
+    """
+    Rotate a 32-bit word to the right.
+
+    :param word: The input word.
+    :param bits: The number of bits to rotate by.
+    :return: The rotated word.
+    """
+    return ((word >> bits) | (word << (32 - bits))) & 0xFFFFFFFF
+
+
+def te_tables() -> Tuple[WordTable, WordTable, WordTable, WordTable]:
+    """
+    Precompute the encryption T-tables.
+
+    Entry x of the first table is the column produced by MixColumns from a
+    column holding S(x) in its first row, (02, 01, 01, 03) * S(x). The other
+    tables hold the same columns for the other rows, rotated by one byte each.
+
+    :return: The four 256-entry tables of 32-bit words.
+    """
+    te0 = tuple((xtime(s) << 24) | (s << 16) | (s << 8) | (xtime(s) ^ s) for s in S_BOX)
+    te1 = tuple(rotate_word(word, 8) for word in te0)
+    te2 = tuple(rotate_word(word, 16) for word in te0)
+    te3 = tuple(rotate_word(word, 24) for word in te0)
+    return te0, te1, te2, te3
+
+
+def td_tables() -> Tuple[WordTable, WordTable, WordTable, WordTable]:
+    """
+    Precompute the decryption T-tables.
+
+    Entry x of the first table is the column produced by InvMixColumns from a
+    column holding InvS(x) in its first row, (0e, 09, 0d, 0b) * InvS(x).
+
+    :return: The four 256-entry tables of 32-bit words.
+    """
+    td0 = tuple(
+        (gf_mul(s, 0x0E) << 24)
+        | (gf_mul(s, 0x09) << 16)
+        | (gf_mul(s, 0x0D) << 8)
+        | gf_mul(s, 0x0B)
+        for s in INV_S_BOX
+    )
+    td1 = tuple(rotate_word(word, 8) for word in td0)
+    td2 = tuple(rotate_word(word, 16) for word in td0)
+    td3 = tuple(rotate_word(word, 24) for word in td0)
+    return td0, td1, td2, td3
+
+
+# The inverse S-box, derived from the S-box
+INV_S_BOX: Final[Tuple[int, ...]] = tuple(sorted(range(256), key=S_BOX.__getitem__))
+
+TE0, TE1, TE2, TE3 = te_tables()
+TD0, TD1, TD2, TD3 = td_tables()
+
+# The S-box placed in every row, for the final round without MixColumns
+SB0: Final[WordTable] = tuple(s << 24 for s in S_BOX)
+SB1: Final[WordTable] = tuple(s << 16 for s in S_BOX)
+SB2: Final[WordTable] = tuple(s << 8 for s in S_BOX)
+SB3: Final[WordTable] = tuple(S_BOX)
+
+# The same for the inverse S-box
+IB0: Final[WordTable] = tuple(s << 24 for s in INV_S_BOX)
+IB1: Final[WordTable] = tuple(s << 16 for s in INV_S_BOX)
+IB2: Final[WordTable] = tuple(s << 8 for s in INV_S_BOX)
+IB3: Final[WordTable] = INV_S_BOX
+
+
+def sub_word(word: int) -> int:
+    """
+    Apply the S-box to every byte of a word.
+
+    :param word: The input word.
+    :return: The substituted word.
+    """
+    return (
+        SB0[word >> 24]
+        | SB1[(word >> 16) & 0xFF]
+        | SB2[(word >> 8) & 0xFF]
+        | SB3[word & 0xFF]
+    )
+
+
+def expand_key(key: bytes) -> Tuple[int, ...]:
+    """
+    Expand an AES key into the round key words.
+
+    :param key: The 16-, 24- or 32-byte key.
+    :return: The round key words, four per round plus four for the initial round.
+    """
+    if len(key) not in (16, 24, 32):
+        raise ValueError("AES key must be 16, 24 or 32 bytes long")
+
+    # Nk words of the key and Nr + 1 round keys, Nr being Nk + 6
+    nk = len(key) // 4
+    words: List[int] = list(struct.unpack(f">{nk}I", key))
+    for i in range(nk, 4 * (nk + 7)):
+        word = words[-1]
+        if i % nk == 0:
+            # RotWord, SubWord and XOR with RCON
+            word = sub_word(rotate_word(word, 24)) ^ (RCON[i // nk - 1] << 24)
+        elif nk > 6 and i % nk == 4:
+            # AES-256 also substitutes the word in the middle of every key
+            word = sub_word(word)
+        words.append(words[-nk] ^ word)
+    return tuple(words)
+
+
+def inv_mix_word(word: int) -> int:
+    """
+    Apply InvMixColumns to one column word.
+
+    The decryption T-tables hold InvMixColumns of the inverse S-box, so
+    looking up the S-box value of every byte cancels the substitution.
+
+    :param word: The input column.
+    :return: The mixed column.
+    """
+    return (
+        TD0[S_BOX[word >> 24]]
+        ^ TD1[S_BOX[(word >> 16) & 0xFF]]
+        ^ TD2[S_BOX[(word >> 8) & 0xFF]]
+        ^ TD3[S_BOX[word & 0xFF]]
+    )
+
+
+def decryption_keys(round_keys: Tuple[int, ...]) -> Tuple[int, ...]:
+    """
+    Derive the round keys of the equivalent inverse cipher.
+
+    The round keys are taken in reverse order, and InvMixColumns is applied
+    to all but the first and the last, so that the inverse rounds have the
+    same structure as the forward ones.
+
+    :param round_keys: The encryption round key words.
+    :return: The decryption round key words.
+    """
+    rounds = len(round_keys) // 4 - 1
+    keys: List[int] = list(round_keys[4 * rounds :])
+    for i in range(4 * (rounds - 1), 0, -4):
+        keys += map(inv_mix_word, round_keys[i : i + 4])
+    return tuple(keys + list(round_keys[:4]))
+
+
+class AESKey:
+    """
+    An AES key with its round keys expanded once, for encryption and decryption.
+    """
+
+    __slots__ = ("key", "rounds", "encryption_keys", "decryption_keys")
+
+    def __init__(self, key: bytes) -> None:
+        """
+        Expand the round keys.
+
+        :param key: The 16-, 24- or 32-byte AES key.
+        """
+        self.key: Final[bytes] = bytes(key)
+        self.encryption_keys: Final[Tuple[int, ...]] = expand_key(self.key)
+        self.decryption_keys: Final[Tuple[int, ...]] = decryption_keys(
+            self.encryption_keys
+        )
+        self.rounds: Final[int] = len(self.encryption_keys) // 4 - 1
+
+    @staticmethod
+    def from_bytes(key: bytes) -> "AESKey":
+        """
+        Get the expanded key, reusing one expanded recently for the same key.
+
+        :param key: The 16-, 24- or 32-byte AES key.
+        :return: The expanded key.
+        """
+        return _cached_key(bytes(key))
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def _cached_key(key: bytes) -> AESKey:
+    """
+    Expand a key, keeping the most recently used ones.
+
+    :param key: The 16-, 24- or 32-byte AES key.
+    :return: The expanded key.
+    """
+    return AESKey(key)
+
+
+class AESEngine:
+    """
+    An AES implementation working on four 32-bit column words with T-tables.
+
+    SubBytes, ShiftRows and MixColumns of one round are fused into 16 table
+    lookups, the round key is added with four XORs.
+    """
+
+    block_size: Final[int] = 16
+
+    def __init__(self, key: Union[bytes, AESKey]) -> None:
+        """
+        Initialize the engine with an expanded key.
+
+        :param key: The 16-, 24- or 32-byte AES key or its expanded form.
+        """
+        if not isinstance(key, AESKey):
+            key = AESKey.from_bytes(key)
+
+        self.key: Final[AESKey] = key
+        self.encryption_keys: Final[Tuple[int, ...]] = key.encryption_keys
+        self.decryption_keys: Final[Tuple[int, ...]] = key.decryption_keys
+        self.rounds: Final[int] = key.rounds
+
+    def encrypt_words(self, s0: int, s1: int, s2: int, s3: int) -> Words:
+        """
+        Encrypt a block given as four column words.
+
+        :param s0: The first column, its first row being the most significant byte.
+        :param s1: The second column.
+        :param s2: The third column.
+        :param s3: The fourth column.
+        :return: The four columns of the ciphertext.
+        """
+        te0, te1, te2, te3 = TE0, TE1, TE2, TE3
+        rk = self.encryption_keys
+
+        # Initial AddRoundKey
+        s0, s1, s2, s3 = s0 ^ rk[0], s1 ^ rk[1], s2 ^ rk[2], s3 ^ rk[3]
+
+        for i in range(4, 4 * self.rounds, 4):
+            # Row r of column c comes from column c + r after ShiftRows
+            s0, s1, s2, s3 = (
+                te0[s0 >> 24]
+                ^ te1[(s1 >> 16) & 0xFF]
+                ^ te2[(s2 >> 8) & 0xFF]
+                ^ te3[s3 & 0xFF]
+                ^ rk[i],
+                te0[s1 >> 24]
+                ^ te1[(s2 >> 16) & 0xFF]
+                ^ te2[(s3 >> 8) & 0xFF]
+                ^ te3[s0 & 0xFF]
+                ^ rk[i + 1],
+                te0[s2 >> 24]
+                ^ te1[(s3 >> 16) & 0xFF]
+                ^ te2[(s0 >> 8) & 0xFF]
+                ^ te3[s1 & 0xFF]
+                ^ rk[i + 2],
+                te0[s3 >> 24]
+                ^ te1[(s0 >> 16) & 0xFF]
+                ^ te2[(s1 >> 8) & 0xFF]
+                ^ te3[s2 & 0xFF]
+                ^ rk[i + 3],
+            )
+
+        # The final round has no MixColumns
+        i = 4 * self.rounds
+        return (
+            (
+                SB0[s0 >> 24]
+                | SB1[(s1 >> 16) & 0xFF]
+                | SB2[(s2 >> 8) & 0xFF]
+                | SB3[s3 & 0xFF]
+            )
+            ^ rk[i],
+            (
+                SB0[s1 >> 24]
+                | SB1[(s2 >> 16) & 0xFF]
+                | SB2[(s3 >> 8) & 0xFF]
+                | SB3[s0 & 0xFF]
+            )
+            ^ rk[i + 1],
+            (
+                SB0[s2 >> 24]
+                | SB1[(s3 >> 16) & 0xFF]
+                | SB2[(s0 >> 8) & 0xFF]
+                | SB3[s1 & 0xFF]
+            )
+            ^ rk[i + 2],
+            (
+                SB0[s3 >> 24]
+                | SB1[(s0 >> 16) & 0xFF]
+                | SB2[(s1 >> 8) & 0xFF]
+                | SB3[s2 & 0xFF]
+            )
+            ^ rk[i + 3],
+        )
+
+    def encrypt_block(self, block: bytes) -> bytes:
+        """
+        Encrypt a 16-byte block.
+
+        :param block: The plaintext block.
+        :return: The ciphertext block.
+        """
+        if len(block) != 16:
+            raise ValueError("AES block must be 16 bytes long")
+        return BLOCK.pack(*self.encrypt_words(*BLOCK.unpack(block)))
+
+    def encrypt_block_into(
+        self, src: bytes, dst: bytearray, src_offset: int = 0, dst_offset: int = 0
+    ) -> None:
+        """
+        Encrypt a block read from one buffer into another, without allocating blocks.
+
+        The buffers may be the same, to encrypt in place. Only the block I/O
+        works in place: the rounds run in encrypt_words on four ints, as a new
+        tuple every round.
+
+        :param src: The buffer holding the plaintext block, any bytes-like object.
+        :param dst: The writable buffer receiving the ciphertext block.
+        :param src_offset: The offset of the block in src.
+        :param dst_offset: The offset of the block in dst.
+        """
+        BLOCK.pack_into(
+            dst, dst_offset, *self.encrypt_words(*BLOCK.unpack_from(src, src_offset))
+        )
+
+    def decrypt_words(self, s0: int, s1: int, s2: int, s3: int) -> Words:
+        """
+        Decrypt a block given as four column words, with the equivalent inverse cipher.
+
+        :param s0: The first column, its first row being the most significant byte.
+        :param s1: The second column.
+        :param s2: The third column.
+        :param s3: The fourth column.
+        :return: The four columns of the plaintext.
+        """
+        td0, td1, td2, td3 = TD0, TD1, TD2, TD3
+        rk = self.decryption_keys
+
+        # Initial AddRoundKey
+        s0, s1, s2, s3 = s0 ^ rk[0], s1 ^ rk[1], s2 ^ rk[2], s3 ^ rk[3]
+
+        for i in range(4, 4 * self.rounds, 4):
+            # Row r of column c comes from column c - r after InvShiftRows
+            s0, s1, s2, s3 = (
+                td0[s0 >> 24]
+                ^ td1[(s3 >> 16) & 0xFF]
+                ^ td2[(s2 >> 8) & 0xFF]
+                ^ td3[s1 & 0xFF]
+                ^ rk[i],
+                td0[s1 >> 24]
+                ^ td1[(s0 >> 16) & 0xFF]
+                ^ td2[(s3 >> 8) & 0xFF]
+                ^ td3[s2 & 0xFF]
+                ^ rk[i + 1],
+                td0[s2 >> 24]
+                ^ td1[(s1 >> 16) & 0xFF]
+                ^ td2[(s0 >> 8) & 0xFF]
+                ^ td3[s3 & 0xFF]
+                ^ rk[i + 2],
+                td0[s3 >> 24]
+                ^ td1[(s2 >> 16) & 0xFF]
+                ^ td2[(s1 >> 8) & 0xFF]
+                ^ td3[s0 & 0xFF]
+                ^ rk[i + 3],
+            )
+
+        # The final round has no InvMixColumns
+        i = 4 * self.rounds
+        return (
+            (
+                IB0[s0 >> 24]
+                | IB1[(s3 >> 16) & 0xFF]
+                | IB2[(s2 >> 8) & 0xFF]
+                | IB3[s1 & 0xFF]
+            )
+            ^ rk[i],
+            (
+                IB0[s1 >> 24]
+                | IB1[(s0 >> 16) & 0xFF]
+                | IB2[(s3 >> 8) & 0xFF]
+                | IB3[s2 & 0xFF]
+            )
+            ^ rk[i + 1],
+            (
+                IB0[s2 >> 24]
+                | IB1[(s1 >> 16) & 0xFF]
+                | IB2[(s0 >> 8) & 0xFF]
+                | IB3[s3 & 0xFF]
+            )
+            ^ rk[i + 2],
+            (
+                IB0[s3 >> 24]
+                | IB1[(s2 >> 16) & 0xFF]
+                | IB2[(s1 >> 8) & 0xFF]
+                | IB3[s0 & 0xFF]
+            )
+            ^ rk[i + 3],
+        )
+
+    def decrypt_block(self, block: bytes) -> bytes:
+        """
+        Decrypt a 16-byte block.
+
+        :param block: The ciphertext block.
+        :return: The plaintext block.
+        """
+        if len(block) != 16:
+            raise ValueError("AES block must be 16 bytes long")
+        return BLOCK.pack(*self.decrypt_words(*BLOCK.unpack(block)))
+
+    def decrypt_block_into(
+        self, src: bytes, dst: bytearray, src_offset: int = 0, dst_offset: int = 0
+    ) -> None:
+        """
+        Decrypt a block read from one buffer into another, without allocating blocks.
+
+        The buffers may be the same, to decrypt in place. Only the block I/O
+        works in place: the rounds run in decrypt_words on four ints, as a new
+        tuple every round.
+
+        :param src: The buffer holding the ciphertext block, any bytes-like object.
+        :param dst: The writable buffer receiving the plaintext block.
+        :param src_offset: The offset of the block in src.
+        :param dst_offset: The offset of the block in dst.
+        """
+        BLOCK.pack_into(
+            dst, dst_offset, *self.decrypt_words(*BLOCK.unpack_from(src, src_offset))
+        )
+
+
+def main() -> None:
+    plaintext = bytes.fromhex("3243F6A8885A308D313198A2E0370734")
+    key = bytes.fromhex("2B7E151628AED2A6ABF7158809CF4F3C")
+
+    engine = AESEngine(key)
+    cipher_text = engine.encrypt_block(plaintext)
+    plain_text = engine.decrypt_block(cipher_text)
+
+    return print(
+        f"Cipher Text : {cipher_text.hex().upper()}\n"
+        f"Expected : 3925841D02DC09FBDC118597196A0B32\n"
+        f"Plain Text : {plain_text.hex().upper()}"
+    )
+
+
+if __name__ == "__main__":
+    main()
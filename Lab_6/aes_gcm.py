@@ -0,0 +1,337 @@
+#!/usr/bin/python3
+import hmac
+import struct
+from functools import lru_cache
+from typing import Final, List, Optional, Tuple, Union
+
+from aes_engine import BLOCK, AESEngine, AESKey
+
+BLOCK_SIZE: Final[int] = 16
+MASK_32: Final[int] = (1 << 32) - 1
+
+# Number of hash subkeys whose multiplication tables are kept for reuse
+TABLE_CACHE_SIZE: Final[int] = 256
+
+# The reduction polynomial x^128 + x^7 + x^2 + x + 1 in the reflected bit order of GCM
+R_POLY: Final[int] = 0xE1 << 120
+
+
+def shift_right(value: int, bits: int) -> int:
+    """
+    Multiply an element of GF(2^128) by x^bits, one bit at a time.
+
+    The first bit of a block is the coefficient of x^0, the most significant
+    bit of the integer, so multiplying by x shifts the integer to the right.
+
+    :param value: The element as a 128-bit integer.
+    :param bits: The power of x.
+    :return: The product.
+    """
+    for _ in range(bits):
+        value = (value >> 1) ^ R_POLY if value & 1 else value >> 1
+    return value
+
+
+# Entry b is what the byte b shifted out of a block contributes when the block
+# is multiplied by x^8, the same for every hash subkey
+REDUCTIONS: Final[Tuple[int, ...]] = tuple(shift_right(byte, 8) for byte in range(256))
+
+
+@lru_cache(maxsize=TABLE_CACHE_SIZE)
+def ghash_tables(h: int) -> Tuple[int, ...]:
+    """
+    Precompute the 8-bit Shoup table for multiplication by the hash subkey.
+
+    Entry b of the table is the product of H and the byte b placed in the
+    first byte of a block, the reductions are shared in REDUCTIONS.
+
+    :param h: The hash subkey as a 128-bit integer.
+    :return: The multiplication table.
+    """
+    # The bits of the first byte, 0x80 being x^0
+    powers: List[int] = [shift_right(h, 7 - bit) for bit in range(8)]
+
+    products: List[int] = [0] * 256
+    for byte in range(1, 256):
+        low = byte & -byte
+        products[byte] = products[byte ^ low] ^ powers[low.bit_length() - 1]
+
+    return tuple(products)
+
+
+class GHash:
+    """
+    The GHASH function of GCM, absorbing data incrementally.
+    """
+
+    def __init__(self, h: int) -> None:
+        """
+        Initialize the hash with the cached tables of the hash subkey.
+
+        :param h: The hash subkey as a 128-bit integer.
+        """
+        self._products: Tuple[int, ...] = ghash_tables(h)
+        self._state: int = 0
+        self._buffer: bytes = b""
+
+    def _absorb(self, data: bytes) -> None:
+        """
+        Absorb whole blocks.
+
+        :param data: A whole number of blocks.
+        """
+        products, reductions = self._products, REDUCTIONS
+        y = self._state
+        for high, low in struct.iter_unpack(">QQ", data):
+            # Horner's rule over the bytes of Y ^ X, starting from the last one
+            z = 0
+            for byte in (y ^ ((high << 64) | low)).to_bytes(16, "little"):
+                z = (z >> 8) ^ reductions[z & 0xFF] ^ products[byte]
+            y = z
+        self._state = y
+
+    def update(self, data: bytes) -> None:
+        """
+        Absorb the next piece of data, keeping an incomplete block for later.
+
+        :param data: The data.
+        """
+        data = self._buffer + data
+        length = len(data) - len(data) % BLOCK_SIZE
+        self._absorb(data[:length])
+        self._buffer = data[length:]
+
+    def pad(self) -> None:
+        """
+        Complete the incomplete block with zeros and absorb it.
+        """
+        if self._buffer:
+            self._absorb(self._buffer.ljust(BLOCK_SIZE, b"\x00"))
+            self._buffer = b""
+
+    def digest(self) -> int:
+        """
+        Get the hash of the data absorbed so far, padded.
+
+        :return: The hash as a 128-bit integer.
+        """
+        self.pad()
+        return self._state
+
+
+class AESGCM:
+    """
+    AES in Galois/Counter Mode, encrypting or decrypting incrementally.
+
+    The additional authenticated data is passed to update_aad before the
+    message is passed to update. finalize returns the tag after encryption
+    and checks it after decryption.
+    """
+
+    def __init__(
+        self,
+        key: Union[bytes, AESKey, AESEngine],
+        iv: bytes,
+        decrypt: bool = False,
+        tag_length: int = 16,
+    ) -> None:
+        """
+        Initialize the mode.
+
+        :param key: The AES key, its expanded form, or an AESEngine.
+        :param iv: The initialization vector, 12 bytes recommended.
+        :param decrypt: True for decryption, False for encryption.
+        :param tag_length: The length of the tag in bytes, from 4 to 16.
+        """
+        if not iv:
+            raise ValueError("The IV must not be empty")
+        if not 4 <= tag_length <= 16:
+            raise ValueError("The tag must be 4 to 16 bytes long")
+
+        self.engine: Final[AESEngine] = (
+            key if isinstance(key, AESEngine) else AESEngine(key)
+        )
+        self.decrypt: Final[bool] = decrypt
+        self.tag_length: Final[int] = tag_length
+
+        # The hash subkey is the encryption of the zero block
+        h0, h1, h2, h3 = self.engine.encrypt_words(0, 0, 0, 0)
+        self._h: Final[int] = (h0 << 96) | (h1 << 64) | (h2 << 32) | h3
+
+        if len(iv) == 12:
+            j0 = (int.from_bytes(iv, "big") << 32) | 1
+        else:
+            ghash = GHash(self._h)
+            ghash.update(iv)
+            ghash.pad()
+            ghash.update(struct.pack(">QQ", 0, 8 * len(iv)))
+            j0 = ghash.digest()
+        self._j0: Final[int] = j0
+
+        self._ghash: GHash = GHash(self._h)
+        self._aad_length: int = 0
+        self._length: int = 0
+        self._counter: int = j0 & MASK_32
+        self._keystream: bytes = b""
+        self._finalized: bool = False
+
+    def _check(self) -> None:
+        """
+        Make sure the context can still be used.
+        """
+        if self._finalized:
+            raise ValueError("The context is already finalized")
+
+    def _next_blocks(self, count: int) -> bytearray:
+        """
+        Generate the next keystream blocks, incrementing the last 32 bits of the counter.
+
+        :param count: The number of blocks.
+        :return: The keystream blocks joined together.
+        """
+        j0 = self._j0
+        w0, w1, w2 = j0 >> 96, (j0 >> 64) & MASK_32, (j0 >> 32) & MASK_32
+
+        encrypt, pack_into = self.engine.encrypt_words, BLOCK.pack_into
+        stream = bytearray(BLOCK_SIZE * count)
+        counter = self._counter
+        for i in range(count):
+            pack_into(
+                stream,
+                BLOCK_SIZE * i,
+                *encrypt(w0, w1, w2, (counter + i + 1) & MASK_32),
+            )
+        self._counter = (counter + count) & MASK_32
+        return stream
+
+    def update_aad(self, data: bytes) -> None:
+        """
+        Authenticate the next piece of additional data.
+
+        :param data: The additional authenticated data.
+        """
+        self._check()
+        if self._length:
+            raise ValueError("The additional data must come before the message")
+
+        self._ghash.update(data)
+        self._aad_length += len(data)
+
+    def update(self, data: bytes) -> bytes:
+        """
+        Process the next piece of the message.
+
+        :param data: The plaintext or the ciphertext.
+        :return: The output available so far.
+        """
+        self._check()
+        if not data:
+            return b""
+
+        # The additional data is padded when the message starts
+        if not self._length:
+            self._ghash.pad()
+        self._length += len(data)
+
+        # Use the keystream left over from the previous call first
+        missing = len(data) - len(self._keystream)
+        keystream = self._keystream
+        if missing > 0:
+            keystream += self._next_blocks(-(-missing // BLOCK_SIZE))
+        self._keystream = keystream[len(data) :]
+
+        output = (
+            int.from_bytes(data, "big") ^ int.from_bytes(keystream[: len(data)], "big")
+        ).to_bytes(len(data), "big")
+
+        # The tag always covers the ciphertext
+        self._ghash.update(data if self.decrypt else output)
+        return output
+
+    def _tag(self) -> bytes:
+        """
+        Compute the tag of the data processed.
+
+        :return: The tag.
+        """
+        self._check()
+        self._finalized = True
+
+        self._ghash.pad()
+        self._ghash.update(struct.pack(">QQ", 8 * self._aad_length, 8 * self._length))
+        s = self._ghash.digest()
+
+        j0 = self._j0
+        e0, e1, e2, e3 = self.engine.encrypt_words(
+            j0 >> 96, (j0 >> 64) & MASK_32, (j0 >> 32) & MASK_32, j0 & MASK_32
+        )
+        tag = ((e0 << 96) | (e1 << 64) | (e2 << 32) | e3) ^ s
+        return tag.to_bytes(BLOCK_SIZE, "big")[: self.tag_length]
+
+    def finalize(self, tag: Optional[bytes] = None) -> bytes:
+        """
+        Finish processing.
+
+        :param tag: The tag to check, required for decryption.
+        :return: The tag after encryption, an empty string after a successful decryption.
+        """
+        if not self.decrypt:
+            return self._tag()
+
+        if tag is None:
+            raise ValueError("The tag is required for decryption")
+        if not hmac.compare_digest(self._tag(), tag):
+            raise ValueError("Authentication failed")
+        return b""
+
+    def encrypt(self, plaintext: bytes, aad: bytes = b"") -> Tuple[bytes, bytes]:
+        """
+        Encrypt and authenticate a whole message in one call.
+
+        :param plaintext: The plaintext.
+        :param aad: The additional authenticated data.
+        :return: The ciphertext and the tag.
+        """
+        self.update_aad(aad)
+        cipher_text = self.update(plaintext)
+        return cipher_text, self.finalize()
+
+    def decrypt_and_verify(
+        self, ciphertext: bytes, tag: bytes, aad: bytes = b""
+    ) -> bytes:
+        """
+        Decrypt a whole message in one call and check its tag.
+
+        :param ciphertext: The ciphertext.
+        :param tag: The tag.
+        :param aad: The additional authenticated data.
+        :return: The plaintext.
+        """
+        self.update_aad(aad)
+        plain_text = self.update(ciphertext)
+        self.finalize(tag)
+        return plain_text
+
+
+def main() -> None:
+    # The GCM specification, test case 4
+    key = bytes.fromhex("FEFFE9928665731C6D6A8F9467308308")
+    iv = bytes.fromhex("CAFEBABEFACEDBADDECAF888")
+    aad = bytes.fromhex("FEEDFACEDEADBEEFFEEDFACEDEADBEEFABADDAD2")
+    plaintext = bytes.fromhex(
+        "D9313225F88406E5A55909C5AFF5269A86A7A9531534F7DA2E4C303D8A318A72"
+        "1C3C0C95956809532FCF0E2449A6B525B16AEDF5AA0DE657BA637B39"
+    )
+
+    cipher_text, tag = AESGCM(key, iv).encrypt(plaintext, aad)
+    plain_text = AESGCM(key, iv, decrypt=True).decrypt_and_verify(cipher_text, tag, aad)
+
+    return print(
+        f"Cipher Text : {cipher_text.hex().upper()}\n"
+        f"Tag : {tag.hex().upper()}\n"
+        f"Plain Text : {plain_text.hex().upper()}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/python3
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import Final, List, Optional, Tuple, Union
+
+from aes_ctr import AESCTR, xor_bytes
+from aes_engine import AESEngine, AESKey
+
+BLOCK_SIZE: Final[int] = 16
+
+# Preferred number of bytes handed to a worker at once
+PARALLEL_CHUNK_SIZE: Final[int] = 1 << 20
+
+# The modes a range can be processed in
+ECB_ENCRYPT: Final[str] = "ecb-encrypt"
+ECB_DECRYPT: Final[str] = "ecb-decrypt"
+CTR: Final[str] = "ctr"
+
+# The mode, the key, the initial counter, the stream offset and the range
+Task = Tuple[str, bytes, int, int, int, int]
+
+Path = Union[str, os.PathLike]
+
+
+def _crypt_range(task: Task, src: memoryview, dst: memoryview) -> None:
+    """
+    Process one range of a buffer.
+
+    :param task: The mode, the key, the counter, the stream offset and the range.
+    :param src: The input buffer.
+    :param dst: The output buffer, possibly the same as the input.
+    """
+    mode, key, counter, offset, start, stop = task
+
+    # The expanded key is cached in every worker process
+    engine = AESEngine(AESKey.from_bytes(key))
+
+    if mode == CTR:
+        ctr = AESCTR(engine, counter.to_bytes(BLOCK_SIZE, "big"))
+        ctr.seek(offset + start)
+        dst[start:stop] = xor_bytes(src[start:stop], ctr.keystream(stop - start))
+        return
+
+    crypt_into = (
+        engine.encrypt_block_into if mode == ECB_ENCRYPT else engine.decrypt_block_into
+    )
+    for position in range(start, stop, BLOCK_SIZE):
+        crypt_into(src, dst, position, position)
+
+
+def _buffer_task(name: str, task: Task) -> None:
+    """
+    Process one range of a shared memory block in place, in a worker process.
+
+    :param name: The name of the shared memory block.
+    :param task: The mode, the key, the counter, the stream offset and the range.
+    """
+    # Attaching registers the block again with the shared resource tracker,
+    # and the parent unregisters it when unlinking it
+    shared = shared_memory.SharedMemory(name=name)
+    try:
+        _crypt_range(task, shared.buf, shared.buf)
+    finally:
+        shared.close()
+
+
+def _file_task(source: str, destination: str, task: Task) -> None:
+    """
+    Process one range of a file into a preallocated file, in a worker process.
+
+    :param source: The path of the input file.
+    :param destination: The path of the output file.
+    :param task: The mode, the key, the counter, the stream offset and the range.
+    """
+    with open(source, "rb") as reader, open(destination, "r+b") as writer:
+        with mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_READ) as data, mmap.mmap(
+            writer.fileno(), 0
+        ) as output:
+            _crypt_range(task, memoryview(data), memoryview(output))
+
+
+class ParallelAES:
+    """
+    AES in ECB and CTR mode, split across worker processes.
+
+    Every block of these modes is processed independently, so a buffer is
+    split into ranges handled by a pool of processes. The data is moved
+    through shared memory, or through the mapped files, and never pickled:
+    the workers only receive the range to process and write it in place.
+    """
+
+    def __init__(
+        self,
+        key: bytes,
+        workers: Optional[int] = None,
+        chunk_size: int = PARALLEL_CHUNK_SIZE,
+    ) -> None:
+        """
+        Initialize the engine and start the worker processes.
+
+        :param key: The 16-, 24- or 32-byte AES key.
+        :param workers: The number of worker processes, one per core by default.
+        :param chunk_size: The preferred number of bytes handed to a worker at once.
+        """
+        # Expanded once here, to fail early on an invalid key
+        self.key: Final[bytes] = AESKey.from_bytes(key).key
+        self.chunk_size: Final[int] = max(1, chunk_size // BLOCK_SIZE) * BLOCK_SIZE
+
+        # The workers must share the resource tracker of this process, or the
+        # shared memory blocks they attach to are reported as leaked by their own
+        if os.name == "posix":
+            resource_tracker.ensure_running()
+        self._executor: Final[ProcessPoolExecutor] = ProcessPoolExecutor(workers)
+
+    def __enter__(self) -> "ParallelAES":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Stop the worker processes.
+        """
+        self._executor.shutdown()
+
+    def _tasks(self, mode: str, length: int, counter: int, offset: int) -> List[Task]:
+        """
+        Split a buffer into ranges.
+
+        :param mode: The mode.
+        :param length: The length of the buffer.
+        :param counter: The initial counter block as an integer, for CTR.
+        :param offset: The offset of the buffer in the keystream, for CTR.
+        :return: The tasks of every range.
+        """
+        return [
+            (
+                mode,
+                self.key,
+                counter,
+                offset,
+                start,
+                min(start + self.chunk_size, length),
+            )
+            for start in range(0, length, self.chunk_size)
+        ]
+
+    def _run(self, mode: str, data: bytes, counter: int = 0, offset: int = 0) -> bytes:
+        """
+        Process a buffer in the worker processes through shared memory.
+
+        :param mode: The mode.
+        :param data: The input data.
+        :param counter: The initial counter block as an integer, for CTR.
+        :param offset: The offset of the data in the keystream, for CTR.
+        :return: The output data.
+        """
+        if not data:
+            return b""
+
+        shared = shared_memory.SharedMemory(create=True, size=len(data))
+        try:
+            shared.buf[: len(data)] = data
+            futures = [
+                self._executor.submit(_buffer_task, shared.name, task)
+                for task in self._tasks(mode, len(data), counter, offset)
+            ]
+            for future in futures:
+                future.result()
+            return bytes(shared.buf[: len(data)])
+        finally:
+            shared.close()
+            shared.unlink()
+
+    def encrypt_ecb(self, data: bytes) -> bytes:
+        """
+        Encrypt whole blocks independently.
+
+        :param data: The plaintext, a whole number of blocks.
+        :return: The ciphertext.
+        """
+        if len(data) % BLOCK_SIZE:
+            raise ValueError("The data is not a whole number of blocks")
+        return self._run(ECB_ENCRYPT, data)
+
+    def decrypt_ecb(self, data: bytes) -> bytes:
+        """
+        Decrypt whole blocks independently.
+
+        :param data: The ciphertext, a whole number of blocks.
+        :return: The plaintext.
+        """
+        if len(data) % BLOCK_SIZE:
+            raise ValueError("The data is not a whole number of blocks")
+        return self._run(ECB_DECRYPT, data)
+
+    def crypt_ctr(self, data: bytes, counter: bytes, offset: int = 0) -> bytes:
+        """
+        Encrypt or decrypt data in counter mode, as AESCTR does.
+
+        :param data: The input data.
+        :param counter: The 16-byte initial counter block.
+        :param offset: The offset of the data in the keystream.
+        :return: The output data.
+        """
+        if len(counter) != BLOCK_SIZE:
+            raise ValueError("The initial counter block must be 16 bytes long")
+        return self._run(CTR, data, int.from_bytes(counter, "big"), offset)
+
+    def crypt_ctr_file(self, source: Path, destination: Path, counter: bytes) -> None:
+        """
+        Encrypt or decrypt a file in counter mode.
+
+        The output is preallocated and every worker maps both files, so the
+        data does not pass through the parent process.
+
+        :param source: The path of the input file.
+        :param destination: The path of the output file.
+        :param counter: The 16-byte initial counter block.
+        """
+        if len(counter) != BLOCK_SIZE:
+            raise ValueError("The initial counter block must be 16 bytes long")
+
+        length: int = os.path.getsize(source)
+        with open(destination, "wb") as writer:
+            writer.truncate(length)
+        if not length:
+            return
+
+        futures = [
+            self._executor.submit(
+                _file_task, os.fspath(source), os.fspath(destination), task
+            )
+            for task in self._tasks(CTR, length, int.from_bytes(counter, "big"), 0)
+        ]
+        for future in futures:
+            future.result()
+
+
+def main() -> None:
+    key = bytes.fromhex("2B7E151628AED2A6ABF7158809CF4F3C")
+    counter = bytes.fromhex("F0F1F2F3F4F5F6F7F8F9FAFBFCFDFEFF")
+    message = os.urandom(1 << 18)
+
+    with ParallelAES(key, chunk_size=1 << 15) as engine:
+        cipher_text = engine.crypt_ctr(message, counter)
+        plain_text = engine.crypt_ctr(cipher_text, counter)
+        blocks = engine.decrypt_ecb(engine.encrypt_ecb(message))
+
+    return print(
+        f"CTR matches AESCTR : {cipher_text == AESCTR(key, counter).update(message)}\n"
+        f"CTR round trip : {plain_text == message}\n"
+        f"ECB round trip : {blocks == message}"
+    )
+
+
+if __name__ == "__main__":
+    main()